@@ -46,6 +46,7 @@ from .preprocessing import (
 
 from .ocr_engine import (
     run_ocr,
+    get_ocr_engine,
     MultiPassOCREngine,
     MultiPassOCRResult
 )
@@ -125,6 +126,7 @@ __all__ = [
     
     # OCR Engine
     "run_ocr",
+    "get_ocr_engine",
     "MultiPassOCREngine", 
     "MultiPassOCRResult",
     
@@ -21,18 +21,15 @@ from pathlib import Path
 from PIL import Image
 
 from .preprocessing import (
-    ImagePreprocessor, 
-    DocumentType, 
     PreprocessingResult,
     preprocess_image
 )
 from .ocr_engine import (
-    MultiPassOCREngine,
     MultiPassOCRResult,
+    get_ocr_engine,
     run_ocr
 )
 from .text_cleaner import (
-    OCRTextCleaner,
     TextCorrector,
     CleaningResult,
     clean_text
@@ -209,21 +206,8 @@ class DocumentIntelligenceEngine:
         document_hint: str
     ) -> PreprocessingResult:
         """Preprocess the image for optimal OCR."""
-        # Map hint to document type
-        doc_type_map = {
-            "receipt": DocumentType.RECEIPT,
-            "invoice": DocumentType.INVOICE,
-            "handwritten": DocumentType.HANDWRITTEN,
-            "form": DocumentType.FORM,
-        }
-        doc_type = doc_type_map.get(document_hint, DocumentType.UNKNOWN)
-        
-        # Load image
-        image = Image.open(image_path)
-        
-        # Run preprocessing
-        preprocessor = ImagePreprocessor(document_type=doc_type)
-        result = preprocessor.preprocess(image)
+        # Load and preprocess
+        result = preprocess_image(image_path, document_hint)
         
         logger.info(f"DIE: Preprocessing complete - quality={result.estimated_quality:.2f}, "
                    f"transforms={result.applied_transforms}")
@@ -236,7 +220,7 @@ class DocumentIntelligenceEngine:
         document_hint: str
     ) -> MultiPassOCRResult:
         """Run multi-pass OCR on the preprocessed image."""
-        engine = MultiPassOCREngine(lang=self.lang)
+        engine = get_ocr_engine(self.lang)
         result = engine.run_multi_pass(image, document_hint=document_hint)
         
         logger.info(f"DIE: OCR complete - {len(result.primary_text)} chars, "
@@ -247,8 +231,7 @@ class DocumentIntelligenceEngine:
     
     def _clean_text(self, text: str) -> CleaningResult:
         """Clean and correct OCR text."""
-        cleaner = OCRTextCleaner()
-        result = cleaner.clean(text)
+        result = clean_text(text)
         
         logger.info(f"DIE: Text cleaning complete - {result.correction_count} corrections")
         
@@ -23,18 +23,15 @@ from PIL import Image
 
 # Import all enterprise modules
 from .preprocessing import (
-    ImagePreprocessor, 
-    DocumentType, 
     PreprocessingResult,
     preprocess_image
 )
 from .ocr_engine import (
-    MultiPassOCREngine,
     MultiPassOCRResult,
+    get_ocr_engine,
     run_ocr
 )
 from .text_cleaner import (
-    OCRTextCleaner,
     CleaningResult,
     clean_text
 )
@@ -199,9 +196,7 @@ class EnterpriseDocumentIntelligence:
         self.enable_learning = enable_learning
         
         # Initialize components
-        self.ocr_engine = MultiPassOCREngine(lang=lang)
-        self.preprocessor = ImagePreprocessor()
-        self.text_cleaner = OCRTextCleaner()
+        self.ocr_engine = get_ocr_engine(lang)
         self.consensus_extractor = ConsensusExtractor()
         self.layout_analyzer = LayoutAnalyzer()
         self.confirmation_manager = ConfirmationManager()
@@ -360,17 +355,7 @@ class EnterpriseDocumentIntelligence:
         document_hint: str
     ) -> PreprocessingResult:
         """Preprocess image for OCR."""
-        doc_type_map = {
-            "receipt": DocumentType.RECEIPT,
-            "invoice": DocumentType.INVOICE,
-            "handwritten": DocumentType.HANDWRITTEN,
-            "form": DocumentType.FORM,
-        }
-        doc_type = doc_type_map.get(document_hint, DocumentType.UNKNOWN)
-        
-        image = Image.open(image_path)
-        self.preprocessor = ImagePreprocessor(document_type=doc_type)
-        result = self.preprocessor.preprocess(image)
+        result = preprocess_image(image_path, document_hint)
         
         logger.info(f"EDI: Preprocessing complete - quality={result.estimated_quality:.2f}")
         return result
@@ -389,7 +374,7 @@ class EnterpriseDocumentIntelligence:
     
     def _clean_text(self, text: str) -> CleaningResult:
         """Clean OCR text."""
-        result = self.text_cleaner.clean(text)
+        result = clean_text(text)
         logger.info(f"EDI: Text cleaning complete - {result.correction_count} corrections")
         return result
     
@@ -401,20 +386,7 @@ class EnterpriseDocumentIntelligence:
         """Analyze document layout."""
         # Try to use word-level data if available
         if ocr_result.all_passes and ocr_result.all_passes[0].words:
-            words = [
-                {
-                    'text': w.text,
-                    'left': w.left,
-                    'top': w.top,
-                    'width': w.width,
-                    'height': w.height,
-                    'confidence': w.confidence,
-                    'line_num': w.line_num,
-                    'word_num': w.word_num,
-                    'block_num': w.block_num
-                }
-                for w in ocr_result.all_passes[0].words
-            ]
+            words = ocr_result.all_passes[0].words.records()
             result = self.layout_analyzer.analyze(words)
         else:
             result = self.layout_analyzer.analyze_from_text(text)
@@ -435,7 +407,6 @@ class EnterpriseDocumentIntelligence:
                 match_score=0.0,
                 entry=None,
                 confidence_boost=0.0,
-                field_hints={},
                 explanation="Learning disabled"
             )
         
@@ -21,25 +21,27 @@ import re
 import logging
 from typing import Optional, Any, NamedTuple
 from dataclasses import dataclass, field
-from enum import Enum
-from collections import defaultdict
+from enum import IntEnum, auto
+from itertools import groupby
+from operator import attrgetter
 
 logger = logging.getLogger(__name__)
 
 
-class Zone(Enum):
+# Enum members number from 1 (auto) so that none of them is falsy
+class Zone(IntEnum):
     """Document zones based on vertical position."""
-    HEADER = "header"   # Top 15%
-    BODY = "body"       # Middle 65%
-    FOOTER = "footer"   # Bottom 20%
+    HEADER = auto()   # Top 15%
+    BODY = auto()     # Middle 65%
+    FOOTER = auto()   # Bottom 20%
 
 
-class Alignment(Enum):
+class Alignment(IntEnum):
     """Text alignment within a line."""
-    LEFT = "left"
-    CENTER = "center"
-    RIGHT = "right"
-    UNKNOWN = "unknown"
+    LEFT = auto()
+    CENTER = auto()
+    RIGHT = auto()
+    UNKNOWN = auto()
 
 
 @dataclass
@@ -96,6 +98,15 @@ class LayoutLine:
     text: str
     average_word_height: float
     is_prominent: bool = False  # Larger than average
+    
+    # Lowercased forms for label searches, derived from text and words
+    text_lower: str = field(init=False, repr=False, compare=False)
+    words_lower: list[str] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        """Lowercase the text and words once for label searches."""
+        self.text_lower = self.text.lower()
+        self.words_lower = [w.text.lower() for w in self.words]
 
 
 @dataclass
@@ -232,8 +243,9 @@ class LayoutAnalyzer:
         footer_start = int(page_height * self.FOOTER_ZONE_PERCENT)
         
         # Assign zones to words
+        get_zone = self._get_zone
         for word in self.words:
-            word.zone = self._get_zone(word.bbox.center_y, header_end, footer_start)
+            word.zone = get_zone(word.bbox.center_y, header_end, footer_start)
         
         # Group words into lines
         lines = self._group_into_lines()
@@ -243,16 +255,17 @@ class LayoutAnalyzer:
         median_height = sorted(heights)[len(heights) // 2] if heights else 20
         
         # Mark prominent lines
+        prominence_height = median_height * self.PROMINENCE_THRESHOLD
         for line in lines:
-            if line.average_word_height > median_height * self.PROMINENCE_THRESHOLD:
+            if line.average_word_height > prominence_height:
                 line.is_prominent = True
         
         # Detect tables
         tables = self._detect_tables(lines)
         
         # Categorize lines
-        header_lines = [l for l in lines if l.zone == Zone.HEADER]
-        footer_lines = [l for l in lines if l.zone == Zone.FOOTER]
+        header_lines = [l for l in lines if l.zone is Zone.HEADER]
+        footer_lines = [l for l in lines if l.zone is Zone.FOOTER]
         prominent_lines = [l for l in lines if l.is_prominent]
         
         logger.info(f"LayoutAnalyzer: Found {len(lines)} lines, "
@@ -369,17 +382,12 @@ class LayoutAnalyzer:
         if not self.words:
             return []
         
-        # Group by line_num from OCR
-        line_groups: dict[int, list[LayoutWord]] = defaultdict(list)
-        for word in self.words:
-            line_groups[word.line_num].append(word)
+        # Sort once by (line_num, left) so each line's words come out in order
+        self.words.sort(key=lambda w: (w.line_num, w.bbox.left))
         
         lines = []
-        for line_num in sorted(line_groups.keys()):
-            words = sorted(line_groups[line_num], key=lambda w: w.bbox.left)
-            
-            if not words:
-                continue
+        for line_num, group in groupby(self.words, key=attrgetter('line_num')):
+            words = list(group)
             
             # Calculate line bounding box
             left = min(w.bbox.left for w in words)
@@ -440,6 +448,11 @@ class LayoutAnalyzer:
         """Detect table structures based on column alignment."""
         tables = []
         
+        # Bind thresholds once instead of looking them up per line
+        min_cols = self.MIN_TABLE_COLUMNS
+        min_rows = self.MIN_TABLE_ROWS
+        tolerance = self.COLUMN_ALIGNMENT_TOLERANCE
+        
         # Look for groups of lines with aligned columns
         # This is a simplified heuristic - could be enhanced with ML
         
@@ -447,7 +460,7 @@ class LayoutAnalyzer:
         potential_table_lines = []
         
         for line in lines:
-            if len(line.words) >= self.MIN_TABLE_COLUMNS:
+            if len(line.words) >= min_cols:
                 # Check for large gaps between words
                 gaps = []
                 for i in range(len(line.words) - 1):
@@ -459,7 +472,7 @@ class LayoutAnalyzer:
                     potential_table_lines.append(line)
         
         # Group consecutive table-like lines
-        if len(potential_table_lines) >= self.MIN_TABLE_ROWS:
+        if len(potential_table_lines) >= min_rows:
             # Check if they have aligned columns
             first_line = potential_table_lines[0]
             column_positions = [w.bbox.left for w in first_line.words]
@@ -468,10 +481,10 @@ class LayoutAnalyzer:
             for line in potential_table_lines[1:]:
                 # Check if column positions roughly match
                 line_positions = [w.bbox.left for w in line.words]
-                if self._columns_aligned(column_positions, line_positions):
+                if self._columns_aligned(column_positions, line_positions, tolerance):
                     aligned_lines.append(line)
             
-            if len(aligned_lines) >= self.MIN_TABLE_ROWS:
+            if len(aligned_lines) >= min_rows:
                 # Create table
                 cells = []
                 for row_idx, line in enumerate(aligned_lines):
@@ -509,14 +522,18 @@ class LayoutAnalyzer:
     def _columns_aligned(
         self, 
         reference: list[int], 
-        candidate: list[int]
+        candidate: list[int],
+        tolerance: Optional[int] = None
     ) -> bool:
         """Check if column positions are roughly aligned."""
         if len(candidate) != len(reference):
             return False
         
+        if tolerance is None:
+            tolerance = self.COLUMN_ALIGNMENT_TOLERANCE
+        
         for ref, cand in zip(reference, candidate):
-            if abs(ref - cand) > self.COLUMN_ALIGNMENT_TOLERANCE:
+            if abs(ref - cand) > tolerance:
                 return False
         
         return True
@@ -571,9 +588,13 @@ class LayoutAnalyzer:
         """
         label_lower = label.lower()
         
-        for line in layout.lines:
-            for i, word in enumerate(line.words):
-                if label_lower in word.text.lower():
+        for line_idx, line in enumerate(layout.lines):
+            # Cheap line-level pre-filter before word-level matching
+            if label_lower not in line.text_lower:
+                continue
+            
+            for i, word_lower in enumerate(line.words_lower):
+                if label_lower in word_lower:
                     # Found the label
                     
                     if search_direction in ["right", "both"]:
@@ -585,7 +606,6 @@ class LayoutAnalyzer:
                     
                     if search_direction in ["below", "both"]:
                         # Look for value on next line
-                        line_idx = layout.lines.index(line)
                         if line_idx + 1 < len(layout.lines):
                             next_line = layout.lines[line_idx + 1]
                             if next_line.text.strip():
@@ -608,7 +628,7 @@ class LayoutAnalyzer:
         Returns:
             List of (amount, line) tuples
         """
-        zone_lines = [l for l in layout.lines if l.zone == zone]
+        zone_lines = [l for l in layout.lines if l.zone is zone]
         amounts = []
         
         for line in zone_lines:
@@ -640,8 +660,8 @@ class LayoutAnalyzer:
             (amount, line) tuple or None
         """
         lines = layout.lines
-        if zone:
-            lines = [l for l in lines if l.zone == zone]
+        if zone is not None:
+            lines = [l for l in lines if l.zone is zone]
         
         rightmost = None
         rightmost_x = 0
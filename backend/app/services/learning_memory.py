@@ -14,19 +14,147 @@ On new scans:
 This improves accuracy over time for repeated documents.
 """
 import os
+import sys
 import json
+import math
+import time
+import atexit
 import hashlib
 import logging
-from typing import Optional, Any
-from dataclasses import dataclass, field, asdict
+import threading
+import weakref
+from typing import Optional, Any, Iterable
+from dataclasses import dataclass, field, fields, MISSING
 from datetime import datetime
 from pathlib import Path
 from collections import Counter
+from functools import reduce, lru_cache
+from itertools import islice, count
+from operator import xor, itemgetter
+from heapq import nlargest, heappush, heappop, heapify
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import numpy as np
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    # Fuzzy keyword matching is skipped without numpy/scipy
+    linear_sum_assignment = None
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+def _dumps(data: Any) -> bytes:
+    """Serialize to compact JSON bytes, using orjson when available."""
+    # Unusual correction values (Decimal, datetime, ...) are stored as strings
+    if orjson is not None:
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, separators=(',', ':'), default=str).encode()
+
+
+def _loads(payload: bytes) -> Any:
+    """Parse JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+def _payload_digest(payload: bytes) -> bytes:
+    """Digest of a serialized entry, used to detect changes between saves."""
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+def _write_atomic(path: Path, payload: bytes) -> None:
+    """Write bytes to a temp file and atomically move it into place."""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+# Fuzzy header keyword matching (catches OCR variants of the same word)
+FUZZY_KEYWORD_LIMIT = 8  # Keywords per side fed to the assignment
+FUZZY_KERNEL_SIGMA = 0.2  # Width of the Gaussian kernel on normalized edit distance
+FUZZY_MIN_SIMILARITY = 0.5  # Kernel values below this count as no match
+
+# Largest normalized edit distance whose kernel value reaches FUZZY_MIN_SIMILARITY
+_FUZZY_MAX_DISTANCE = math.sqrt(-2 * FUZZY_KERNEL_SIGMA ** 2 * math.log(FUZZY_MIN_SIMILARITY))
+
+
+def _edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance between two strings."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb)
+            ))
+        previous = current
+    return previous[-1]
+
+
+@lru_cache(maxsize=16384)
+def _keyword_similarity(a: str, b: str) -> float:
+    """Gaussian kernel over normalized edit distance (0.0 - 1.0)."""
+    longest = max(len(a), len(b))
+    # Length difference is a lower bound on the edit distance
+    if longest == 0 or abs(len(a) - len(b)) / longest > _FUZZY_MAX_DISTANCE:
+        return 0.0
+    distance = _edit_distance(a, b) / longest
+    similarity = math.exp(-distance ** 2 / (2 * FUZZY_KERNEL_SIGMA ** 2))
+    return similarity if similarity >= FUZZY_MIN_SIMILARITY else 0.0
+
+
+def _bigrams(word: str) -> set[str]:
+    """Distinct character bigrams of a word."""
+    return {word[i:i + 2] for i in range(len(word) - 1)}
+
+
+def _fuzzy_keyword_credit(left: list[str], right: list[str]) -> float:
+    """
+    Best one-to-one fuzzy matching between two keyword lists.
+    
+    Solves the assignment problem (Hungarian algorithm) on the kernel matrix
+    of the first FUZZY_KEYWORD_LIMIT keywords of each list.
+    
+    Returns:
+        Sum of matched similarities (each pair contributes at most 1.0)
+    """
+    if linear_sum_assignment is None or not left or not right:
+        return 0.0
+    
+    left = left[:FUZZY_KEYWORD_LIMIT]
+    right = right[:FUZZY_KEYWORD_LIMIT]
+    kernel = np.array([[_keyword_similarity(a, b) for b in right] for a in left])
+    if not kernel.any():
+        return 0.0
+    
+    rows, cols = linear_sum_assignment(kernel, maximize=True)
+    return float(kernel[rows, cols].sum())
+
+
+@lru_cache(maxsize=4096)
+def _component_hash(component: str) -> int:
+    """
+    Hash a single fingerprint component to a 64-bit integer.
+    
+    Memoized: type, vendor and common keyword components repeat across
+    nearly every fingerprint.
+    """
+    digest = hashlib.blake2b(component.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+@dataclass(slots=True)
 class DocumentFingerprint:
     """
     Fingerprint of a document's layout and characteristics.
@@ -42,27 +170,41 @@ class DocumentFingerprint:
     
     # Document characteristics
     document_type: str
-    vendor_name: Optional[str]
+    vendor_name: Optional[str]  # Normalized to interned lowercase
     currency: str
     
     # Computed hash
     fingerprint_hash: str = ""
     
+    # Cached header keyword set for similarity scoring (not persisted)
+    _header_set: frozenset = field(
+        default=frozenset(), init=False, repr=False, compare=False
+    )
+    
     def __post_init__(self):
-        """Compute fingerprint hash after initialization."""
+        """Normalize the vendor, cache keywords and compute the fingerprint hash."""
+        if self.vendor_name:
+            self.vendor_name = sys.intern(self.vendor_name.lower())
+        self._header_set = frozenset(self.header_keywords)
         if not self.fingerprint_hash:
             self.fingerprint_hash = self._compute_hash()
     
     def _compute_hash(self) -> str:
-        """Compute a hash representing this fingerprint."""
+        """
+        Compute a hash representing this fingerprint.
+        
+        The hash is the XOR of per-component hashes, so it is independent
+        of keyword order and changing one component only needs
+        ``old ^ h(old_component) ^ h(new_component)``.
+        """
         components = [
-            str(self.line_count // 5 * 5),  # Bucket by 5 lines
-            ','.join(sorted(self.header_keywords[:5])),
-            self.document_type,
-            self.vendor_name or '',
+            f"lines:{self.line_count // 5 * 5}",  # Bucket by 5 lines
+            f"type:{self.document_type}",
+            f"vendor:{self.vendor_name or ''}",
         ]
-        content = '|'.join(components)
-        return hashlib.md5(content.encode()).hexdigest()[:16]
+        components.extend(f"kw:{kw}" for kw in self.header_keywords[:5])
+        value = reduce(xor, map(_component_hash, components), 0)
+        return f"{value:016x}"
     
     def similarity_score(self, other: 'DocumentFingerprint') -> float:
         """
@@ -71,11 +213,28 @@ class DocumentFingerprint:
         Returns:
             Similarity score (0.0 - 1.0)
         """
+        score, left, right = self._exact_similarity(other)
+        
+        # Near-duplicate header keywords earn partial credit
+        score += _fuzzy_keyword_credit(left, right) * 0.05
+        
+        return min(score, 1.0)
+    
+    def _exact_similarity(
+        self,
+        other: 'DocumentFingerprint'
+    ) -> tuple[float, list[str], list[str]]:
+        """
+        Score everything except fuzzy keyword credit.
+        
+        Returns:
+            (uncapped score, unshared keywords of self, unshared keywords of other)
+        """
         score = 0.0
         
         # Exact hash match
         if self.fingerprint_hash == other.fingerprint_hash:
-            return 1.0
+            return 1.0, [], []
         
         # Same document type
         if self.document_type == other.document_type:
@@ -83,7 +242,7 @@ class DocumentFingerprint:
         
         # Same vendor
         if self.vendor_name and other.vendor_name:
-            if self.vendor_name.lower() == other.vendor_name.lower():
+            if self.vendor_name == other.vendor_name:
                 score += 0.4
         
         # Similar line count (within 20%)
@@ -93,18 +252,36 @@ class DocumentFingerprint:
                 score += 0.1
         
         # Shared header keywords
-        shared_keywords = set(self.header_keywords) & set(other.header_keywords)
-        if shared_keywords:
-            score += len(shared_keywords) * 0.05
+        shared = self._header_set & other._header_set
+        if shared:
+            score += len(shared) * 0.05
         
         # Same currency
         if self.currency == other.currency:
             score += 0.05
         
-        return min(score, 1.0)
+        return (
+            score,
+            [k for k in self.header_keywords if k not in shared],
+            [k for k in other.header_keywords if k not in shared]
+        )
+    
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            'line_count': self.line_count,
+            'header_keywords': self.header_keywords,
+            'footer_keywords': self.footer_keywords,
+            'has_table': self.has_table,
+            'approximate_word_count': self.approximate_word_count,
+            'document_type': self.document_type,
+            'vendor_name': self.vendor_name,
+            'currency': self.currency,
+            'fingerprint_hash': self.fingerprint_hash
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class FieldPosition:
     """Remembered position of a field in a document layout."""
     field_name: str
@@ -113,9 +290,20 @@ class FieldPosition:
     alignment: str  # "left", "center", "right"
     near_keywords: list[str]
     confidence_boost: float = 0.1  # How much to boost confidence
+    
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            'field_name': self.field_name,
+            'zone': self.zone,
+            'line_percentage': self.line_percentage,
+            'alignment': self.alignment,
+            'near_keywords': self.near_keywords,
+            'confidence_boost': self.confidence_boost
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class UserCorrection:
     """A stored user correction."""
     field_name: str
@@ -125,9 +313,21 @@ class UserCorrection:
     vendor_name: Optional[str]
     timestamp: str
     correction_count: int = 1  # How many times this correction was made
+    
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            'field_name': self.field_name,
+            'original_value': self.original_value,
+            'corrected_value': self.corrected_value,
+            'document_type': self.document_type,
+            'vendor_name': self.vendor_name,
+            'timestamp': self.timestamp,
+            'correction_count': self.correction_count
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class VendorRule:
     """Vendor-specific extraction rule."""
     vendor_name: str
@@ -135,9 +335,39 @@ class VendorRule:
     extraction_hint: str  # e.g., "line_after_TOTAL"
     expected_format: str  # e.g., "###.##"
     confidence_boost: float = 0.15
+    
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            'vendor_name': self.vendor_name,
+            'field_name': self.field_name,
+            'extraction_hint': self.extraction_hint,
+            'expected_format': self.expected_format,
+            'confidence_boost': self.confidence_boost
+        }
+
+
+def _field_spec(cls) -> tuple[tuple[str, Any], ...]:
+    """Get (name, default) pairs for a dataclass's init fields, in order."""
+    return tuple((f.name, f.default) for f in fields(cls) if f.init)
+
+
+def _from_spec(cls, spec: tuple[tuple[str, Any], ...], data: dict) -> Any:
+    """Construct a dataclass positionally from a dict using a cached field spec."""
+    return cls(*[
+        data[name] if default is MISSING else data.get(name, default)
+        for name, default in spec
+    ])
 
 
-@dataclass
+# Field specs cached once at import for fast reconstruction in _load
+_FINGERPRINT_FIELDS = _field_spec(DocumentFingerprint)
+_FIELD_POSITION_FIELDS = _field_spec(FieldPosition)
+_USER_CORRECTION_FIELDS = _field_spec(UserCorrection)
+_VENDOR_RULE_FIELDS = _field_spec(VendorRule)
+
+
+@dataclass(slots=True)
 class LearningMemoryEntry:
     """A complete learning memory entry for a document pattern."""
     fingerprint: DocumentFingerprint
@@ -151,13 +381,37 @@ class LearningMemoryEntry:
     last_seen: str = field(default_factory=lambda: datetime.utcnow().isoformat())
     first_seen: str = field(default_factory=lambda: datetime.utcnow().isoformat())
     
+    @property
+    def usefulness(self) -> int:
+        """Retention score used when pruning (confirmations count double)."""
+        return self.times_seen + self.times_confirmed * 2
+    
+    def field_hints(self) -> dict[str, Any]:
+        """Build extraction hints from field positions and vendor rules."""
+        hints: dict[str, Any] = {}
+        for fp in self.field_positions:
+            hints[fp.field_name] = {
+                'zone': fp.zone,
+                'line_percentage': fp.line_percentage,
+                'near_keywords': fp.near_keywords
+            }
+        
+        # Apply vendor rules
+        for vr in self.vendor_rules:
+            if vr.field_name not in hints:
+                hints[vr.field_name] = {}
+            hints[vr.field_name]['extraction_hint'] = vr.extraction_hint
+            hints[vr.field_name]['expected_format'] = vr.expected_format
+        
+        return hints
+    
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
         return {
-            'fingerprint': asdict(self.fingerprint),
-            'field_positions': [asdict(fp) for fp in self.field_positions],
-            'corrections': [asdict(c) for c in self.corrections],
-            'vendor_rules': [asdict(vr) for vr in self.vendor_rules],
+            'fingerprint': self.fingerprint.to_dict(),
+            'field_positions': [fp.to_dict() for fp in self.field_positions],
+            'corrections': [c.to_dict() for c in self.corrections],
+            'vendor_rules': [vr.to_dict() for vr in self.vendor_rules],
             'times_seen': self.times_seen,
             'times_confirmed': self.times_confirmed,
             'last_seen': self.last_seen,
@@ -168,10 +422,19 @@ class LearningMemoryEntry:
     def from_dict(cls, data: dict) -> 'LearningMemoryEntry':
         """Create from dictionary."""
         return cls(
-            fingerprint=DocumentFingerprint(**data['fingerprint']),
-            field_positions=[FieldPosition(**fp) for fp in data.get('field_positions', [])],
-            corrections=[UserCorrection(**c) for c in data.get('corrections', [])],
-            vendor_rules=[VendorRule(**vr) for vr in data.get('vendor_rules', [])],
+            fingerprint=_from_spec(DocumentFingerprint, _FINGERPRINT_FIELDS, data['fingerprint']),
+            field_positions=[
+                _from_spec(FieldPosition, _FIELD_POSITION_FIELDS, fp)
+                for fp in data.get('field_positions', [])
+            ],
+            corrections=[
+                _from_spec(UserCorrection, _USER_CORRECTION_FIELDS, c)
+                for c in data.get('corrections', [])
+            ],
+            vendor_rules=[
+                _from_spec(VendorRule, _VENDOR_RULE_FIELDS, vr)
+                for vr in data.get('vendor_rules', [])
+            ],
             times_seen=data.get('times_seen', 1),
             times_confirmed=data.get('times_confirmed', 0),
             last_seen=data.get('last_seen', datetime.utcnow().isoformat()),
@@ -179,15 +442,40 @@ class LearningMemoryEntry:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class MemoryMatchResult:
     """Result of matching against learning memory."""
     found_match: bool
     match_score: float  # How well it matches (0.0 - 1.0)
     entry: Optional[LearningMemoryEntry]
     confidence_boost: float  # How much to boost confidence
-    field_hints: dict[str, Any]  # Hints for extraction
     explanation: str
+    
+    # Built from the matched entry on first access
+    _field_hints: Optional[dict[str, Any]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
+    @property
+    def field_hints(self) -> dict[str, Any]:
+        """Hints for extraction from the matched entry."""
+        if self._field_hints is None:
+            if self.found_match and self.entry is not None:
+                self._field_hints = self.entry.field_hints()
+            else:
+                self._field_hints = {}
+        return self._field_hints
+
+
+# Open memories, flushed together on interpreter shutdown; weak so that
+# a discarded instance is not kept alive just for the exit hook
+_live_memories: 'weakref.WeakSet[LearningMemory]' = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_live_memories():
+    for memory in list(_live_memories):
+        memory.flush()
 
 
 class LearningMemory:
@@ -208,69 +496,254 @@ class LearningMemory:
     KNOWN_PATTERN_BOOST = 0.15
     CONFIRMED_PATTERN_BOOST = 0.25
     
+    # Storage format version (bump when fingerprint hashing changes)
+    FORMAT_VERSION = '1.2'
+    
+    # Minimum seconds between coalesced writes to storage
+    SAVE_INTERVAL = 5.0
+    
+    # Index file listing stored entries inside the storage directory
+    MANIFEST_NAME = 'manifest.json'
+    
     def __init__(self, storage_path: Optional[str] = None):
         """
         Initialize learning memory.
         
         Args:
-            storage_path: Path to store learning data (default: ./learning_memory.json)
+            storage_path: Path to store learning data (default: ./learning_memory.json).
+                Entries are stored one file each in a directory named after
+                this path without its suffix; a legacy single file at this
+                path is migrated on the first save.
         """
         if storage_path:
             self.storage_path = Path(storage_path)
         else:
             # Default to backend uploads directory
             self.storage_path = Path(__file__).parent.parent.parent / "uploads" / "learning_memory.json"
+        self.storage_dir = self.storage_path.with_suffix('')
         
         self.entries: dict[str, LearningMemoryEntry] = {}
         self.vendor_index: dict[str, list[str]] = {}  # vendor -> list of fingerprint hashes
+        self.type_index: dict[str, set[str]] = {}  # document type -> fingerprint hashes
+        self.keyword_index: dict[str, set[str]] = {}  # header keyword -> fingerprint hashes
+        self.bigram_index: dict[str, set[str]] = {}  # bigram -> indexed header keywords
+        
+        # Read-copy-update: readers take the published (entries, vendor,
+        # type, keyword, bigram index) tuple without locking; writers
+        # serialize on _lock, modify private copies and publish a new tuple
+        self._lock = threading.Lock()
+        self._snapshot: tuple[dict, dict, dict, dict, dict] = ({}, {}, {}, {}, {})
+        
+        # Write coalescing: mutations mark the memory dirty, writes are batched
+        self._dirty = False
+        self._last_save = 0.0
+        
+        # Content digest of each entry as last written to disk
+        self._persisted_hashes: dict[str, bytes] = {}
+        
+        # Min-heap of (usefulness, sequence, hash) for pruning; entries whose
+        # usefulness has since changed are skipped lazily when popped
+        self._usefulness_heap: list[tuple[int, int, str]] = []
+        self._heap_seq = count()
         
         self._load()
+        
+        # Flush pending changes on interpreter shutdown
+        _live_memories.add(self)
     
     def _load(self) -> None:
         """Load learning memory from storage."""
-        if self.storage_path.exists():
+        manifest_path = self.storage_dir / self.MANIFEST_NAME
+        
+        if manifest_path.exists():
             try:
-                with open(self.storage_path, 'r') as f:
-                    data = json.load(f)
+                manifest = _loads(manifest_path.read_bytes())
+                
+                # Entries saved by an older format carry stale hashes
+                rehash = manifest.get('version') != self.FORMAT_VERSION
+                
+                for hash_key in manifest.get('entries', []):
+                    # A missing or corrupt entry file loses that entry only;
+                    # the next save writes a manifest without it
+                    try:
+                        payload = (self.storage_dir / f"{hash_key}.json").read_bytes()
+                        entry = LearningMemoryEntry.from_dict(_loads(payload))
+                    except Exception as e:
+                        logger.warning(f"LearningMemory: Skipping entry {hash_key} - {e}")
+                        self._dirty = True
+                        continue
+                    self._persisted_hashes[hash_key] = _payload_digest(payload)
+                    
+                    if rehash:
+                        hash_key = entry.fingerprint._compute_hash()
+                        entry.fingerprint.fingerprint_hash = hash_key
+                        self._dirty = True
+                    
+                    self.entries[hash_key] = entry
+                    self._index_entry(hash_key, entry)
+                
+                logger.info(f"LearningMemory: Loaded {len(self.entries)} entries")
+            except Exception as e:
+                logger.warning(f"LearningMemory: Could not load - {e}")
+                self._reset()
+        elif self.storage_path.exists():
+            # Legacy single-file storage; migrated on the next save
+            try:
+                data = _loads(self.storage_path.read_bytes())
+                
+                rehash = data.get('version') != self.FORMAT_VERSION
                 
                 for hash_key, entry_data in data.get('entries', {}).items():
                     entry = LearningMemoryEntry.from_dict(entry_data)
+                    if rehash:
+                        hash_key = entry.fingerprint._compute_hash()
+                        entry.fingerprint.fingerprint_hash = hash_key
                     self.entries[hash_key] = entry
-                    
-                    # Build vendor index
-                    if entry.fingerprint.vendor_name:
-                        vendor_lower = entry.fingerprint.vendor_name.lower()
-                        if vendor_lower not in self.vendor_index:
-                            self.vendor_index[vendor_lower] = []
-                        self.vendor_index[vendor_lower].append(hash_key)
+                    self._index_entry(hash_key, entry)
                 
-                logger.info(f"LearningMemory: Loaded {len(self.entries)} entries")
+                self._dirty = bool(self.entries)
+                logger.info(f"LearningMemory: Loaded {len(self.entries)} legacy entries")
             except Exception as e:
                 logger.warning(f"LearningMemory: Could not load - {e}")
-                self.entries = {}
-                self.vendor_index = {}
+                self._reset()
         else:
             logger.info("LearningMemory: No existing data, starting fresh")
+        
+        self._publish()
+    
+    def _reset(self) -> None:
+        """Clear all in-memory entries and indexes."""
+        self.entries = {}
+        self.vendor_index = {}
+        self.type_index = {}
+        self.keyword_index = {}
+        self.bigram_index = {}
+        self._persisted_hashes = {}
+        self._usefulness_heap = []
+    
+    def _copy_for_write(self) -> None:
+        """Replace entries and indexes with private copies (caller holds _lock)."""
+        self.entries = dict(self.entries)
+        self.vendor_index = {k: list(v) for k, v in self.vendor_index.items()}
+        self.type_index = {k: set(v) for k, v in self.type_index.items()}
+        self.keyword_index = {k: set(v) for k, v in self.keyword_index.items()}
+        self.bigram_index = {k: set(v) for k, v in self.bigram_index.items()}
+    
+    def _publish(self) -> None:
+        """Make the current entries and indexes visible to readers."""
+        self._snapshot = (
+            self.entries, self.vendor_index, self.type_index,
+            self.keyword_index, self.bigram_index
+        )
+    
+    def _track_usefulness(self, hash_key: str, entry: LearningMemoryEntry) -> None:
+        """Record an entry's current usefulness in the pruning heap."""
+        heappush(self._usefulness_heap, (entry.usefulness, next(self._heap_seq), hash_key))
+        
+        # Drop stale heap records once they dominate
+        if len(self._usefulness_heap) > 2 * len(self.entries) + 64:
+            self._usefulness_heap = [
+                record for record in self._usefulness_heap
+                if record[2] in self.entries
+                and self.entries[record[2]].usefulness == record[0]
+            ]
+            heapify(self._usefulness_heap)
+    
+    def _index_entry(self, hash_key: str, entry: LearningMemoryEntry) -> None:
+        """Add an entry to the vendor, type, keyword and bigram indexes."""
+        fp = entry.fingerprint
+        
+        if fp.vendor_name:
+            hashes = self.vendor_index.setdefault(fp.vendor_name, [])
+            if hash_key not in hashes:
+                hashes.append(hash_key)
+        
+        self.type_index.setdefault(fp.document_type, set()).add(hash_key)
+        
+        for keyword in fp.header_keywords:
+            if keyword not in self.keyword_index:
+                self.keyword_index[keyword] = set()
+                for bigram in _bigrams(keyword):
+                    self.bigram_index.setdefault(bigram, set()).add(keyword)
+            self.keyword_index[keyword].add(hash_key)
+        
+        self._track_usefulness(hash_key, entry)
+    
+    def _unindex_entry(self, hash_key: str, entry: LearningMemoryEntry) -> None:
+        """Remove an entry from the vendor, type, keyword and bigram indexes."""
+        fp = entry.fingerprint
+        
+        if fp.vendor_name:
+            hashes = self.vendor_index.get(fp.vendor_name)
+            if hashes and hash_key in hashes:
+                hashes.remove(hash_key)
+        
+        self.type_index.get(fp.document_type, set()).discard(hash_key)
+        
+        for keyword in fp.header_keywords:
+            hashes = self.keyword_index.get(keyword)
+            if hashes is not None:
+                hashes.discard(hash_key)
+                if not hashes:
+                    del self.keyword_index[keyword]
+                    for bigram in _bigrams(keyword):
+                        keywords = self.bigram_index.get(bigram)
+                        if keywords is not None:
+                            keywords.discard(keyword)
+                            if not keywords:
+                                del self.bigram_index[bigram]
     
     def _save(self) -> None:
-        """Save learning memory to storage."""
+        """
+        Save learning memory to storage.
+        
+        Each entry lives in its own file; only entries whose serialized
+        content changed since the last save are rewritten.
+        """
         try:
             # Ensure directory exists
-            self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+            self.storage_dir.mkdir(parents=True, exist_ok=True)
             
-            data = {
-                'version': '1.0',
+            written = 0
+            for hash_key, entry in self.entries.items():
+                payload = _dumps(entry.to_dict())
+                digest = _payload_digest(payload)
+                if self._persisted_hashes.get(hash_key) != digest:
+                    _write_atomic(self.storage_dir / f"{hash_key}.json", payload)
+                    self._persisted_hashes[hash_key] = digest
+                    written += 1
+            
+            manifest = {
+                'version': self.FORMAT_VERSION,
                 'updated_at': datetime.utcnow().isoformat(),
-                'entries': {k: v.to_dict() for k, v in self.entries.items()}
+                'entries': list(self.entries)
             }
+            _write_atomic(self.storage_dir / self.MANIFEST_NAME, _dumps(manifest))
             
-            with open(self.storage_path, 'w') as f:
-                json.dump(data, f, indent=2)
+            # Only delete entry files once the manifest no longer lists them
+            removed = [h for h in self._persisted_hashes if h not in self.entries]
+            for hash_key in removed:
+                (self.storage_dir / f"{hash_key}.json").unlink(missing_ok=True)
+                del self._persisted_hashes[hash_key]
             
-            logger.info(f"LearningMemory: Saved {len(self.entries)} entries")
+            self._dirty = False
+            self._last_save = time.monotonic()
+            logger.info(f"LearningMemory: Saved {len(self.entries)} entries "
+                       f"({written} written, {len(removed)} removed)")
         except Exception as e:
             logger.error(f"LearningMemory: Could not save - {e}")
     
+    def _maybe_save(self) -> None:
+        """Save if there are pending changes and SAVE_INTERVAL has elapsed."""
+        if self._dirty and time.monotonic() - self._last_save >= self.SAVE_INTERVAL:
+            self._save()
+    
+    def flush(self) -> None:
+        """Write any pending changes to storage immediately."""
+        with self._lock:
+            if self._dirty:
+                self._save()
+    
     def create_fingerprint(
         self,
         text: str,
@@ -298,13 +771,11 @@ class LearningMemory:
         
         # Extract header keywords (top 15%)
         header_end = max(int(line_count * 0.15), 3)
-        header_text = ' '.join(lines[:header_end]).lower()
-        header_keywords = self._extract_keywords(header_text)
+        header_keywords = self._extract_keywords(islice(lines, header_end))
         
         # Extract footer keywords (bottom 20%)
         footer_start = int(line_count * 0.80)
-        footer_text = ' '.join(lines[footer_start:]).lower()
-        footer_keywords = self._extract_keywords(footer_text)
+        footer_keywords = self._extract_keywords(islice(lines, footer_start, None))
         
         return DocumentFingerprint(
             line_count=line_count,
@@ -317,18 +788,59 @@ class LearningMemory:
             currency=currency
         )
     
-    def _extract_keywords(self, text: str, max_keywords: int = 10) -> list[str]:
-        """Extract significant keywords from text."""
-        # Remove numbers and short words
-        words = text.split()
-        filtered = [
-            w for w in words 
-            if len(w) > 3 and not w.isdigit() and w.isalpha()
-        ]
+    def _extract_keywords(self, lines: Iterable[str], max_keywords: int = 10) -> list[str]:
+        """Extract significant keywords from lines of text."""
+        # Stream lowercased words, dropping short words and anything
+        # non-alphabetic (which also excludes numbers)
+        counter = Counter(
+            w
+            for line in lines
+            for w in line.lower().split()
+            if len(w) > 3 and w.isalpha()
+        )
+        
+        # Get most common (bounded heap, no full sort)
+        top = nlargest(max_keywords, counter.items(), key=itemgetter(1))
+        return [word for word, _ in top]
+    
+    @staticmethod
+    def _near_keyword_counts(
+        query_keywords: set[str],
+        keyword_index: dict[str, set[str]],
+        bigram_index: dict[str, set[str]]
+    ) -> Counter:
+        """
+        Count, per entry, the query keywords with a near-duplicate in it.
+        
+        Indexed keywords are shortlisted by shared bigrams (each edit
+        removes at most two distinct bigrams) and confirmed with
+        _keyword_similarity. Exact matches are left to the keyword index.
+        
+        Returns:
+            Counter of fingerprint hash -> matching query keyword count
+        """
+        counts: Counter = Counter()
+        if linear_sum_assignment is None:
+            return counts
+        
+        # Longest edit distance any partner of a keyword this long can be within
+        max_edits = _FUZZY_MAX_DISTANCE / (1 - _FUZZY_MAX_DISTANCE)
+        
+        for keyword in query_keywords:
+            bigrams = _bigrams(keyword)
+            overlap: Counter = Counter()
+            for bigram in bigrams:
+                overlap.update(bigram_index.get(bigram, ()))
+            
+            required = max(1, len(bigrams) - 2 * int(len(keyword) * max_edits))
+            hashes: set[str] = set()
+            for other, shared in overlap.items():
+                if (shared >= required and other not in query_keywords
+                        and _keyword_similarity(keyword, other)):
+                    hashes.update(keyword_index[other])
+            counts.update(hashes)
         
-        # Get most common
-        counter = Counter(filtered)
-        return [word for word, _ in counter.most_common(max_keywords)]
+        return counts
     
     def find_match(
         self,
@@ -343,39 +855,79 @@ class LearningMemory:
         Returns:
             MemoryMatchResult with match details
         """
+        # One immutable view for the whole scan; safe against concurrent writers
+        entries, vendor_index, type_index, keyword_index, bigram_index = self._snapshot
+        
         best_match: Optional[LearningMemoryEntry] = None
         best_score = 0.0
         
         # First, check exact hash match
-        if fingerprint.fingerprint_hash in self.entries:
-            entry = self.entries[fingerprint.fingerprint_hash]
+        if fingerprint.fingerprint_hash in entries:
+            entry = entries[fingerprint.fingerprint_hash]
             best_match = entry
             best_score = 1.0
             logger.info(f"LearningMemory: Exact hash match found")
         else:
-            # Check vendor index for faster matching
-            candidates = []
+            # Same-vendor entries are always candidates
+            candidate_hashes: set[str] = set()
             
             if fingerprint.vendor_name:
-                vendor_lower = fingerprint.vendor_name.lower()
-                if vendor_lower in self.vendor_index:
-                    for hash_key in self.vendor_index[vendor_lower]:
-                        if hash_key in self.entries:
-                            candidates.append(self.entries[hash_key])
+                candidate_hashes.update(vendor_index.get(fingerprint.vendor_name, ()))
             
-            # Also check similar fingerprints
-            for entry in self.entries.values():
-                if entry not in candidates:
-                    score = fingerprint.similarity_score(entry.fingerprint)
-                    if score >= self.MATCH_THRESHOLD:
-                        candidates.append(entry)
+            # Without a vendor match an entry can only reach the threshold
+            # through header keywords, exact or fuzzy. Upper bound mirrors
+            # similarity_score: type 0.3 + line count 0.1 + currency 0.05 +
+            # 0.05 per shared keyword + at most 0.05 per fuzzy match.
+            # Entries sharing an exact keyword come from the keyword index,
+            # entries holding a near-duplicate keyword from the bigram index;
+            # no other entry can earn keyword credit at all.
+            query_set = set(fingerprint.header_keywords)
+            shared_counts: Counter = Counter()
+            for keyword in query_set:
+                shared_counts.update(keyword_index.get(keyword, ()))
+            fuzzy_counts = self._near_keyword_counts(query_set, keyword_index, bigram_index)
             
-            # Find best match among candidates
-            for entry in candidates:
-                score = fingerprint.similarity_score(entry.fingerprint)
-                if score > best_score:
+            query_keywords = len(fingerprint.header_keywords)
+            same_type = type_index.get(fingerprint.document_type, set())
+            for hash_key in shared_counts.keys() | fuzzy_counts.keys():
+                shared = shared_counts[hash_key]
+                entry_keywords = len(entries[hash_key].fingerprint.header_keywords)
+                fuzzy = min(
+                    FUZZY_KEYWORD_LIMIT, fuzzy_counts[hash_key],
+                    query_keywords - shared, entry_keywords - shared
+                )
+                upper_bound = 0.15 + (shared + fuzzy) * 0.05
+                if hash_key in same_type:
+                    upper_bound += 0.3
+                if upper_bound >= self.MATCH_THRESHOLD:
+                    candidate_hashes.add(hash_key)
+            
+            # Exact scores first, then fuzzy credit in descending order of
+            # what each candidate could still reach, so the best score so far
+            # prunes the expensive assignments. Ties go to the smallest hash.
+            scored = []
+            for hash_key in candidate_hashes:
+                entry = entries.get(hash_key)
+                if entry is None:
+                    continue
+                score, left, right = fingerprint._exact_similarity(entry.fingerprint)
+                fuzzy_room = 0.0
+                if hash_key in fuzzy_counts:
+                    fuzzy_room = min(FUZZY_KEYWORD_LIMIT, fuzzy_counts[hash_key], len(left), len(right)) * 0.05
+                scored.append((min(score + fuzzy_room, 1.0), hash_key, score, fuzzy_room, left, right, entry))
+            scored.sort(key=lambda item: (-item[0], item[1]))
+            
+            best_key = None
+            for reachable, hash_key, score, fuzzy_room, left, right, entry in scored:
+                if reachable < best_score or reachable < self.MATCH_THRESHOLD:
+                    break
+                if fuzzy_room:
+                    score += _fuzzy_keyword_credit(left, right) * 0.05
+                score = min(score, 1.0)
+                if score > best_score or (score == best_score and best_key is not None and hash_key < best_key):
                     best_score = score
                     best_match = entry
+                    best_key = hash_key
         
         if best_match and best_score >= self.MATCH_THRESHOLD:
             # Calculate confidence boost
@@ -384,22 +936,6 @@ class LearningMemory:
             else:
                 boost = self.KNOWN_PATTERN_BOOST * best_score
             
-            # Extract field hints
-            field_hints = {}
-            for fp in best_match.field_positions:
-                field_hints[fp.field_name] = {
-                    'zone': fp.zone,
-                    'line_percentage': fp.line_percentage,
-                    'near_keywords': fp.near_keywords
-                }
-            
-            # Apply vendor rules
-            for vr in best_match.vendor_rules:
-                if vr.field_name not in field_hints:
-                    field_hints[vr.field_name] = {}
-                field_hints[vr.field_name]['extraction_hint'] = vr.extraction_hint
-                field_hints[vr.field_name]['expected_format'] = vr.expected_format
-            
             explanation = f"Matched known pattern (seen {best_match.times_seen} times"
             if best_match.times_confirmed > 0:
                 explanation += f", confirmed {best_match.times_confirmed} times"
@@ -410,7 +946,6 @@ class LearningMemory:
                 match_score=best_score,
                 entry=best_match,
                 confidence_boost=boost,
-                field_hints=field_hints,
                 explanation=explanation
             )
         
@@ -419,7 +954,6 @@ class LearningMemory:
             match_score=0.0,
             entry=None,
             confidence_boost=0.0,
-            field_hints={},
             explanation="No matching pattern in memory"
         )
     
@@ -441,51 +975,52 @@ class LearningMemory:
         """
         hash_key = fingerprint.fingerprint_hash
         
-        if hash_key in self.entries:
-            # Update existing entry
-            entry = self.entries[hash_key]
-            entry.times_seen += 1
-            entry.last_seen = datetime.utcnow().isoformat()
-            
-            if user_confirmed:
-                entry.times_confirmed += 1
-        else:
-            # Create new entry
-            positions = []
-            if field_positions:
-                for field_name, pos_info in field_positions.items():
-                    positions.append(FieldPosition(
-                        field_name=field_name,
-                        zone=pos_info.get('zone', 'body'),
-                        line_percentage=pos_info.get('line_percentage', 0.5),
-                        alignment=pos_info.get('alignment', 'left'),
-                        near_keywords=pos_info.get('near_keywords', [])
-                    ))
-            
-            entry = LearningMemoryEntry(
-                fingerprint=fingerprint,
-                field_positions=positions,
-                corrections=[],
-                vendor_rules=[],
-                times_seen=1,
-                times_confirmed=1 if user_confirmed else 0
-            )
-            
-            self.entries[hash_key] = entry
+        with self._lock:
+            if hash_key in self.entries:
+                # Update existing entry
+                entry = self.entries[hash_key]
+                entry.times_seen += 1
+                entry.last_seen = datetime.utcnow().isoformat()
+                
+                if user_confirmed:
+                    entry.times_confirmed += 1
+                
+                self._track_usefulness(hash_key, entry)
+            else:
+                # Create new entry
+                positions = []
+                if field_positions:
+                    for field_name, pos_info in field_positions.items():
+                        positions.append(FieldPosition(
+                            field_name=field_name,
+                            zone=pos_info.get('zone', 'body'),
+                            line_percentage=pos_info.get('line_percentage', 0.5),
+                            alignment=pos_info.get('alignment', 'left'),
+                            near_keywords=pos_info.get('near_keywords', [])
+                        ))
+                
+                entry = LearningMemoryEntry(
+                    fingerprint=fingerprint,
+                    field_positions=positions,
+                    corrections=[],
+                    vendor_rules=[],
+                    times_seen=1,
+                    times_confirmed=1 if user_confirmed else 0
+                )
+                
+                # Insert into private copies, then publish them in one step
+                self._copy_for_write()
+                self.entries[hash_key] = entry
+                self._index_entry(hash_key, entry)
+                
+                # Enforce max entries limit
+                if len(self.entries) > self.MAX_ENTRIES:
+                    self._prune_old_entries()
+                
+                self._publish()
             
-            # Update vendor index
-            if fingerprint.vendor_name:
-                vendor_lower = fingerprint.vendor_name.lower()
-                if vendor_lower not in self.vendor_index:
-                    self.vendor_index[vendor_lower] = []
-                if hash_key not in self.vendor_index[vendor_lower]:
-                    self.vendor_index[vendor_lower].append(hash_key)
-        
-        # Enforce max entries limit
-        if len(self.entries) > self.MAX_ENTRIES:
-            self._prune_old_entries()
-        
-        self._save()
+            self._dirty = True
+            self._maybe_save()
         logger.info(f"LearningMemory: Learned from document (hash={hash_key[:8]}...)")
     
     def record_correction(
@@ -506,33 +1041,35 @@ class LearningMemory:
         """
         hash_key = fingerprint.fingerprint_hash
         
-        if hash_key in self.entries:
-            entry = self.entries[hash_key]
-            
-            # Check if this correction already exists
-            existing = None
-            for c in entry.corrections:
-                if (c.field_name == field_name and 
-                    str(c.original_value) == str(original_value)):
-                    existing = c
-                    break
-            
-            if existing:
-                existing.corrected_value = corrected_value
-                existing.correction_count += 1
-                existing.timestamp = datetime.utcnow().isoformat()
-            else:
-                entry.corrections.append(UserCorrection(
-                    field_name=field_name,
-                    original_value=original_value,
-                    corrected_value=corrected_value,
-                    document_type=fingerprint.document_type,
-                    vendor_name=fingerprint.vendor_name,
-                    timestamp=datetime.utcnow().isoformat()
-                ))
-            
-            self._save()
-            logger.info(f"LearningMemory: Recorded correction for {field_name}")
+        with self._lock:
+            if hash_key in self.entries:
+                entry = self.entries[hash_key]
+                
+                # Check if this correction already exists
+                existing = None
+                for c in entry.corrections:
+                    if (c.field_name == field_name and 
+                        str(c.original_value) == str(original_value)):
+                        existing = c
+                        break
+                
+                if existing:
+                    existing.corrected_value = corrected_value
+                    existing.correction_count += 1
+                    existing.timestamp = datetime.utcnow().isoformat()
+                else:
+                    entry.corrections.append(UserCorrection(
+                        field_name=field_name,
+                        original_value=original_value,
+                        corrected_value=corrected_value,
+                        document_type=fingerprint.document_type,
+                        vendor_name=fingerprint.vendor_name,
+                        timestamp=datetime.utcnow().isoformat()
+                    ))
+                
+                self._dirty = True
+                self._maybe_save()
+                logger.info(f"LearningMemory: Recorded correction for {field_name}")
     
     def add_vendor_rule(
         self,
@@ -552,32 +1089,34 @@ class LearningMemory:
         """
         vendor_lower = vendor_name.lower()
         
-        # Find or create entry for this vendor
-        if vendor_lower in self.vendor_index and self.vendor_index[vendor_lower]:
-            hash_key = self.vendor_index[vendor_lower][0]
-            if hash_key in self.entries:
-                entry = self.entries[hash_key]
-                
-                # Check if rule already exists
-                existing = None
-                for vr in entry.vendor_rules:
-                    if vr.field_name == field_name:
-                        existing = vr
-                        break
-                
-                if existing:
-                    existing.extraction_hint = extraction_hint
-                    existing.expected_format = expected_format
-                else:
-                    entry.vendor_rules.append(VendorRule(
-                        vendor_name=vendor_name,
-                        field_name=field_name,
-                        extraction_hint=extraction_hint,
-                        expected_format=expected_format
-                    ))
-                
-                self._save()
-                logger.info(f"LearningMemory: Added rule for {vendor_name}/{field_name}")
+        with self._lock:
+            # Find or create entry for this vendor
+            if vendor_lower in self.vendor_index and self.vendor_index[vendor_lower]:
+                hash_key = self.vendor_index[vendor_lower][0]
+                if hash_key in self.entries:
+                    entry = self.entries[hash_key]
+                    
+                    # Check if rule already exists
+                    existing = None
+                    for vr in entry.vendor_rules:
+                        if vr.field_name == field_name:
+                            existing = vr
+                            break
+                    
+                    if existing:
+                        existing.extraction_hint = extraction_hint
+                        existing.expected_format = expected_format
+                    else:
+                        entry.vendor_rules.append(VendorRule(
+                            vendor_name=vendor_name,
+                            field_name=field_name,
+                            extraction_hint=extraction_hint,
+                            expected_format=expected_format
+                        ))
+                    
+                    self._dirty = True
+                    self._maybe_save()
+                    logger.info(f"LearningMemory: Added rule for {vendor_name}/{field_name}")
     
     def get_common_corrections(
         self,
@@ -598,7 +1137,7 @@ class LearningMemory:
         """
         corrections = []
         
-        for entry in self.entries.values():
+        for entry in self._snapshot[0].values():
             for c in entry.corrections:
                 if c.correction_count < min_count:
                     continue
@@ -618,46 +1157,42 @@ class LearningMemory:
         if len(self.entries) <= self.MAX_ENTRIES:
             return
         
-        # Sort by usefulness (times_seen + times_confirmed * 2)
-        sorted_entries = sorted(
-            self.entries.items(),
-            key=lambda x: x[1].times_seen + x[1].times_confirmed * 2,
-            reverse=True
-        )
-        
-        # Keep top entries
-        keep = dict(sorted_entries[:self.MAX_ENTRIES])
-        removed = set(self.entries.keys()) - set(keep.keys())
-        
-        self.entries = keep
-        
-        # Clean up vendor index
-        for vendor, hashes in self.vendor_index.items():
-            self.vendor_index[vendor] = [h for h in hashes if h not in removed]
+        # Evict least useful entries first (oldest first among equals)
+        removed = 0
+        while len(self.entries) > self.MAX_ENTRIES and self._usefulness_heap:
+            usefulness, _, hash_key = heappop(self._usefulness_heap)
+            entry = self.entries.get(hash_key)
+            if entry is None or entry.usefulness != usefulness:
+                continue  # Stale heap record
+            
+            self._unindex_entry(hash_key, entry)
+            del self.entries[hash_key]
+            removed += 1
         
-        logger.info(f"LearningMemory: Pruned {len(removed)} old entries")
+        logger.info(f"LearningMemory: Pruned {removed} old entries")
     
     def get_statistics(self) -> dict[str, Any]:
         """Get learning memory statistics."""
-        total_entries = len(self.entries)
+        entries = self._snapshot[0]
+        total_entries = len(entries)
         total_corrections = sum(
-            len(e.corrections) for e in self.entries.values()
+            len(e.corrections) for e in entries.values()
         )
         total_rules = sum(
-            len(e.vendor_rules) for e in self.entries.values()
+            len(e.vendor_rules) for e in entries.values()
         )
         
         vendors = set()
-        for e in self.entries.values():
+        for e in entries.values():
             if e.fingerprint.vendor_name:
-                vendors.add(e.fingerprint.vendor_name.lower())
+                vendors.add(e.fingerprint.vendor_name)
         
         return {
             "total_patterns": total_entries,
             "unique_vendors": len(vendors),
             "total_corrections": total_corrections,
             "total_vendor_rules": total_rules,
-            "storage_path": str(self.storage_path)
+            "storage_path": str(self.storage_dir)
         }
 
 
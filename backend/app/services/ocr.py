@@ -4,10 +4,23 @@ Uses Tesseract OCR to extract text from receipt/invoice images.
 Includes regex-based parsing to extract structured data (vendor, total, date).
 """
 import re
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
+import numpy as np
 import pytesseract
 from PIL import Image
 
+from .ocr_image import downscale_factor
+from .ocr_text import join_lines
+
+try:
+    # Linear-time matching, no backtracking on long OCR dumps
+    import re2 as regex_engine
+except ImportError:
+    regex_engine = re
+
 # Configure logger for OCR service
 logger = logging.getLogger(__name__)
 
@@ -18,6 +31,21 @@ try:
 except Exception as e:
     logger.warning(f"Tesseract may not be properly installed: {e}")
 
+# Receipts are a single block of text; LSTM engine only
+TESSERACT_CONFIG = '--psm 6 --oem 1'
+
+# Results for recently seen images, keyed by a hash of the OCR input
+OCR_CACHE_SIZE = 256
+_ocr_cache: OrderedDict[bytes, dict] = OrderedDict()
+_ocr_cache_lock = threading.Lock()
+
+# Precompiled patterns for structured data extraction
+_AMOUNT_RE = regex_engine.compile(r'\$?\s?(\d+\.\d{2})')
+# Supports: MM/DD/YYYY, DD/MM/YYYY, YYYY-MM-DD
+_DATE_RE = regex_engine.compile(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}|\d{4}[/-]\d{1,2}[/-]\d{1,2}')
+_LINE_DATE_RE = regex_engine.compile(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}')
+_SKIP_RE = regex_engine.compile(r'(?i)receipt|invoice|total|date|payment|subtotal')
+
 def extract_structured_data(text):
     """
     Simple regex-based extraction for SME fields.
@@ -32,42 +60,30 @@ def extract_structured_data(text):
     
     # GROSS/TOTAL Amount Extraction
     # Strategy: Find all dollar amounts, usually the largest one at the bottom is the total.
-    amounts = re.findall(r'\$?\s?(\d+\.\d{2})', text)
-    if amounts:
-        try:
-            valid_amounts = [float(a) for a in amounts]
-            if valid_amounts:
-                data["total"] = max(valid_amounts)
-        except:
-            pass
+    # Matches stream straight into a float64 array; no list of amount strings is built
+    amounts = np.fromiter(
+        (m.group(1) for m in _AMOUNT_RE.finditer(text)), dtype=np.float64
+    )
+    data["total"] = float(amounts.max()) if amounts.size else None
             
     # Date Extraction
-    # Supports: MM/DD/YYYY, DD/MM/YYYY, YYYY-MM-DD
-    date_pattern = r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})|(\d{4}[/-]\d{1,2}[/-]\d{1,2})'
-    dates = re.findall(date_pattern, text)
-    if dates:
-        for group in dates:
-            for match in group:
-                if match:
-                    data["date"] = match
-                    break
-            if data["date"]:
-                break
+    # First date in the text wins
+    date_match = _DATE_RE.search(text)
+    if date_match:
+        data["date"] = date_match.group()
         
     # Vendor Extraction
     # Heuristic: The first non-empty line that isn't a date or generic label is often the vendor.
-    lines = [line.strip() for line in text.split('\n') if line.strip()]
-    
-    skip_words = ["receipt", "invoice", "total", "date", "payment", "subtotal"]
-    
-    for line in lines:
+    # Stops at the first match, so later lines are never stripped or scanned
+    for line in text.splitlines():
+        line = line.strip()
         if len(line) < 3: continue
         
-        is_date = re.search(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', line)
+        is_date = _LINE_DATE_RE.search(line)
         if is_date: continue
         
-        line_lower = line.lower()
-        if any(word in line_lower for word in skip_words):
+        # Skip generic labels (receipt, invoice, total, date, payment, subtotal)
+        if _SKIP_RE.search(line):
             continue
             
         data["vendor"] = line
@@ -96,18 +112,43 @@ def process_image(file_path: str) -> dict | None:
         image = Image.open(file_path)
         logger.info(f"OCR: Image loaded successfully - size {image.size}, mode {image.mode}")
         
-        # Extract text using Tesseract
-        full_text = pytesseract.image_to_string(image)
+        # Grayscale and cap the size before handing the image to Tesseract
+        # (same pixel-count cap as the preprocessor; narrow receipts keep their width)
+        image = image.convert('L')
+        scale = downscale_factor(*image.size)
+        if scale < 1:
+            new_size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+            image = image.resize(new_size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+            logger.info(f"OCR: Downscaled to {image.size}")
+        
+        # Same pixels give the same OCR output; reuse it on re-uploads
+        cache_key = hashlib.blake2b(image.tobytes(), digest_size=16)
+        cache_key.update(f"{image.size}".encode())
+        cache_key = cache_key.digest()
+        with _ocr_cache_lock:
+            cached = _ocr_cache.get(cache_key)
+            if cached is not None:
+                _ocr_cache.move_to_end(cache_key)
+        if cached is not None:
+            logger.info("OCR: Cache hit")
+            return {**cached, "structured_data": dict(cached["structured_data"])}
         
-        # Get detailed OCR data for confidence calculation
-        try:
-            ocr_data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
-            confidences = [int(c) for c, t in zip(ocr_data['conf'], ocr_data['text']) 
-                          if c != '-1' and t.strip()]
-            confidence = sum(confidences) / len(confidences) / 100 if confidences else 0.0
-        except Exception as conf_err:
-            logger.warning(f"OCR: Could not calculate confidence: {conf_err}")
-            confidence = 0.9 if full_text.strip() else 0.0
+        # Single Tesseract pass: word data gives both text and confidence
+        ocr_data = pytesseract.image_to_data(
+            image, config=TESSERACT_CONFIG, output_type=pytesseract.Output.DICT
+        )
+        confs = np.asarray(ocr_data['conf'], dtype=np.float64)
+        texts = np.char.strip(np.asarray(ocr_data['text'], dtype=str))
+        mask = (confs != -1) & (np.char.str_len(texts) > 0)
+        
+        # Same line/paragraph joining as the multi-pass engine
+        full_text = join_lines(
+            texts[mask].tolist(),
+            np.asarray(ocr_data['block_num'])[mask],
+            np.asarray(ocr_data['par_num'])[mask],
+            np.asarray(ocr_data['line_num'])[mask]
+        )
+        confidence = float(confs[mask].mean()) / 100 if mask.any() else 0.0
 
         if not full_text.strip():
             logger.warning("OCR: No text extracted from image")
@@ -119,12 +160,19 @@ def process_image(file_path: str) -> dict | None:
         logger.info(f"OCR: Success - extracted {len(full_text)} chars, confidence {confidence:.2f}")
         logger.info(f"OCR: Structured data - vendor: {structured_data.get('vendor')}, total: {structured_data.get('total')}")
         
-        return {
+        result = {
             "raw_text": full_text,
             "structured_data": structured_data,
             "confidence": round(confidence, 2)
         }
         
+        with _ocr_cache_lock:
+            _ocr_cache[cache_key] = {**result, "structured_data": dict(structured_data)}
+            if len(_ocr_cache) > OCR_CACHE_SIZE:
+                _ocr_cache.popitem(last=False)
+        
+        return result
+        
     except FileNotFoundError:
         logger.error(f"OCR: File not found - {file_path}")
         return None
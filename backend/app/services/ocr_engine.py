@@ -6,16 +6,192 @@ Implements an intelligent OCR system using Tesseract with:
 - LSTM neural network mode (OEM 1)
 - Per-word confidence tracking
 """
+import os
+import re
+import queue
+import atexit
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache, cached_property
 from typing import Optional
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields, replace
 from enum import Enum
+import numpy as np
 import pytesseract
 from PIL import Image
 
+from .ocr_text import join_lines
+
+try:
+    # In-process libtesseract binding: no subprocess per pass and the
+    # model stays loaded between requests
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
 logger = logging.getLogger(__name__)
 
 
+# image_to_data columns kept per word besides text/confidence; par_num
+# is only used to rebuild paragraph breaks
+_WORD_COLUMNS = (
+    "left", "top", "width", "height", "block_num", "line_num", "word_num", "par_num"
+)
+
+
+# str.translate table deleting ASCII digits
+_DIGIT_DELETE = str.maketrans("", "", "0123456789")
+
+
+def _has_digit(texts: np.ndarray) -> np.ndarray:
+    """Mask of words containing a digit (they lose length when digits are deleted)."""
+    return np.char.str_len(np.char.translate(texts, _DIGIT_DELETE)) < np.char.str_len(texts)
+
+
+# Numeric runs in pass text (fallback when the numbers pass finds none)
+_NUMBER_RE = re.compile(r'[\d.,]+')
+
+# Each pass waits on its own Tesseract subprocess, so threads suffice to
+# run passes in parallel; shared by all engines
+_PASS_EXECUTOR = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1, thread_name_prefix="ocr-pass"
+)
+
+
+def _image_digest(image: Image.Image) -> bytes:
+    """Content hash of an image's pixels, mode and size."""
+    digest = hashlib.blake2b(image.tobytes(), digest_size=16)
+    digest.update(f"{image.mode}{image.size}".encode())
+    return digest.digest()
+
+
+@lru_cache(maxsize=1)
+def _tesseract_version():
+    """Probe the Tesseract binary once per process (spawns a subprocess)."""
+    if tesserocr is not None:
+        return tesserocr.tesseract_version().splitlines()[0]
+    return pytesseract.get_tesseract_version()
+
+
+# tesserocr APIs kept per configuration; each one holds its own loaded
+# model, so the count is capped rather than growing with worker threads
+TESSEROCR_POOL_SIZE = 2
+
+
+class _TesserocrPool:
+    """
+    Up to TESSEROCR_POOL_SIZE APIs for one (lang, oem, psm, extra)
+    configuration, created on demand. An API object is not thread-safe,
+    so each is checked out by one pass at a time; further passes wait.
+    """
+    
+    def __init__(self, lang: str, oem: int, psm: int, extra: str):
+        self._config = (lang, oem, psm, extra)
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(TESSEROCR_POOL_SIZE)
+    
+    def _create(self):
+        lang, oem, psm, extra = self._config
+        api = tesserocr.PyTessBaseAPI(lang=lang, psm=psm, oem=oem)
+        # "-c name=value" options, as passed to the tesseract CLI
+        for option in extra.split("-c ")[1:]:
+            name, _, value = option.partition("=")
+            api.SetVariable(name.strip(), value.strip())
+        return api
+    
+    @contextmanager
+    def checkout(self):
+        """Borrow an API, creating one if none is idle and a slot is free."""
+        with self._slots:
+            try:
+                api = self._idle.get_nowait()
+            except queue.Empty:
+                api = self._create()
+            try:
+                yield api
+            finally:
+                self._idle.put(api)
+    
+    def close(self):
+        """Release the models of all idle APIs."""
+        while True:
+            try:
+                self._idle.get_nowait().End()
+            except queue.Empty:
+                return
+
+
+_tesserocr_pools: dict[tuple, _TesserocrPool] = {}
+_tesserocr_pools_lock = threading.Lock()
+
+
+def _tesserocr_api(lang: str, oem: int, psm: int, extra: str):
+    """Check out a pooled tesserocr API for a configuration (context manager)."""
+    key = (lang, oem, psm, extra)
+    with _tesserocr_pools_lock:
+        pool = _tesserocr_pools.get(key)
+        if pool is None:
+            pool = _tesserocr_pools[key] = _TesserocrPool(*key)
+    return pool.checkout()
+
+
+@atexit.register
+def _close_tesserocr_pools():
+    for pool in _tesserocr_pools.values():
+        pool.close()
+
+
+def _tesserocr_data(api, image: Image.Image) -> dict[str, list]:
+    """
+    Recognize an image and return word data shaped like
+    pytesseract.image_to_data(output_type=DICT).
+    """
+    data: dict[str, list] = {name: [] for name in ("text", "conf", *_WORD_COLUMNS)}
+    
+    api.SetImage(image)
+    api.Recognize()
+    iterator = api.GetIterator()
+    if iterator is None:
+        return data
+    
+    RIL = tesserocr.RIL
+    block = par = line = word = 0
+    for word_iter in tesserocr.iterate_level(iterator, RIL.WORD):
+        # Beginning of a block is also the beginning of a paragraph and line
+        if word_iter.IsAtBeginningOf(RIL.BLOCK):
+            block += 1
+            par = 0
+        if word_iter.IsAtBeginningOf(RIL.PARA):
+            par += 1
+            line = 0
+        if word_iter.IsAtBeginningOf(RIL.TEXTLINE):
+            line += 1
+            word = 0
+        word += 1
+        
+        box = word_iter.BoundingBox(RIL.WORD)
+        if box is None:
+            continue
+        left, top, right, bottom = box
+        
+        data["text"].append(word_iter.GetUTF8Text(RIL.WORD) or "")
+        data["conf"].append(word_iter.Confidence(RIL.WORD))
+        data["left"].append(left)
+        data["top"].append(top)
+        data["width"].append(right - left)
+        data["height"].append(bottom - top)
+        data["block_num"].append(block)
+        data["par_num"].append(par)
+        data["line_num"].append(line)
+        data["word_num"].append(word)
+    
+    return data
+
+
 class PSMMode(Enum):
     """Tesseract Page Segmentation Modes for different document types."""
     AUTO = 3           # Fully automatic page segmentation
@@ -49,11 +225,57 @@ class OCRWord:
     word_num: int
 
 
+@dataclass
+class OCRColumns:
+    """
+    Words detected by one OCR pass, stored column-wise.
+    
+    One NumPy array per OCRWord field; iterating yields OCRWord rows.
+    """
+    text: np.ndarray
+    confidence: np.ndarray  # 0-100 from Tesseract
+    left: np.ndarray
+    top: np.ndarray
+    width: np.ndarray
+    height: np.ndarray
+    block_num: np.ndarray
+    line_num: np.ndarray
+    word_num: np.ndarray
+    
+    @classmethod
+    def empty(cls) -> "OCRColumns":
+        """Columns for a pass that produced no words."""
+        ints = np.empty(0, dtype=np.int64)
+        return cls(np.empty(0, dtype=str), np.empty(0), *([ints] * 7))
+    
+    def __len__(self) -> int:
+        return len(self.text)
+    
+    def copy(self) -> "OCRColumns":
+        """Columns backed by copies of every array."""
+        return OCRColumns(*(getattr(self, f.name).copy() for f in fields(self)))
+    
+    @cached_property
+    def text_lower(self) -> np.ndarray:
+        """Lowercased word texts, computed once per pass."""
+        return np.char.lower(self.text)
+    
+    def __iter__(self):
+        columns = (getattr(self, f.name).tolist() for f in fields(self))
+        return (OCRWord(*row) for row in zip(*columns))
+    
+    def records(self) -> list[dict]:
+        """Words as dicts keyed by field name (layout analyzer input)."""
+        names = [f.name for f in fields(self)]
+        columns = [getattr(self, name).tolist() for name in names]
+        return [dict(zip(names, row)) for row in zip(*columns)]
+
+
 @dataclass
 class OCRPassResult:
     """Result from a single OCR pass."""
     text: str
-    words: list[OCRWord]
+    words: OCRColumns
     config_used: str
     average_confidence: float
     word_count: int
@@ -70,6 +292,16 @@ class MultiPassOCRResult:
     low_confidence_words: list[str]
     numbers_detected: list[str]
     config_summary: str
+    
+    def copy(self) -> 'MultiPassOCRResult':
+        """Copy with fresh containers, so callers never share cached state."""
+        return replace(
+            self,
+            all_passes=[replace(p, words=p.words.copy()) for p in self.all_passes],
+            word_confidences=dict(self.word_confidences),
+            low_confidence_words=list(self.low_confidence_words),
+            numbers_detected=list(self.numbers_detected)
+        )
 
 
 class MultiPassOCREngine:
@@ -112,6 +344,13 @@ class MultiPassOCREngine:
     LOW_CONFIDENCE_THRESHOLD: float = 60.0
     HIGH_CONFIDENCE_THRESHOLD: float = 85.0
     
+    # High-confidence numeric words in the general pass that make the
+    # numbers-focused pass redundant
+    NUMBERS_PASS_SKIP_COUNT: int = 3
+    
+    # Recent results kept per engine, keyed by image content and hint
+    RESULT_CACHE_SIZE: int = 256
+    
     def __init__(self, lang: str = "eng"):
         """
         Initialize OCR engine.
@@ -121,11 +360,14 @@ class MultiPassOCREngine:
         """
         self.lang = lang
         self._verify_tesseract()
+        
+        self._result_cache: OrderedDict[tuple[bytes, str], MultiPassOCRResult] = OrderedDict()
+        self._cache_lock = threading.Lock()
     
     def _verify_tesseract(self) -> None:
         """Verify Tesseract is installed and accessible."""
         try:
-            version = pytesseract.get_tesseract_version()
+            version = _tesseract_version()
             logger.info(f"OCR Engine: Tesseract {version} initialized")
         except Exception as e:
             logger.error(f"OCR Engine: Tesseract not found - {e}")
@@ -161,58 +403,41 @@ class MultiPassOCREngine:
         
         # Get detailed OCR data with word-level info
         try:
-            ocr_data = pytesseract.image_to_data(
-                image, 
-                lang=self.lang,
-                config=config_str,
-                output_type=pytesseract.Output.DICT
-            )
+            if tesserocr is not None:
+                cfg = self.CONFIGS.get(config_name, self.CONFIGS["general"])
+                with _tesserocr_api(self.lang, cfg["oem"], cfg["psm"], cfg["extra"]) as api:
+                    ocr_data = _tesserocr_data(api, image)
+            else:
+                ocr_data = pytesseract.image_to_data(
+                    image, 
+                    lang=self.lang,
+                    config=config_str,
+                    output_type=pytesseract.Output.DICT
+                )
         except Exception as e:
             logger.error(f"OCR Pass [{config_name}]: Failed - {e}")
             return OCRPassResult(
                 text="",
-                words=[],
+                words=OCRColumns.empty(),
                 config_used=config_str,
                 average_confidence=0.0,
                 word_count=0
             )
         
+        # Column arrays, filtered once: skip empty results or invalid confidence
+        texts = np.char.strip(np.asarray(ocr_data["text"], dtype=str))
+        confs = np.asarray(ocr_data["conf"], dtype=np.float64)
+        keep = (confs != -1) & (np.char.str_len(texts) > 0)
+        
+        columns = {name: np.asarray(ocr_data[name])[keep] for name in _WORD_COLUMNS}
+        par_num = columns.pop("par_num")
+        
         # Extract words with confidence
-        words: list[OCRWord] = []
-        confidences: list[float] = []
+        words = OCRColumns(text=texts[keep], confidence=confs[keep], **columns)
         
-        n_boxes = len(ocr_data["text"])
-        for i in range(n_boxes):
-            text = ocr_data["text"][i].strip()
-            conf = ocr_data["conf"][i]
-            
-            # Skip empty results or invalid confidence
-            if not text or conf == -1:
-                continue
-            
-            conf_float = float(conf)
-            confidences.append(conf_float)
-            
-            words.append(OCRWord(
-                text=text,
-                confidence=conf_float,
-                left=ocr_data["left"][i],
-                top=ocr_data["top"][i],
-                width=ocr_data["width"][i],
-                height=ocr_data["height"][i],
-                block_num=ocr_data["block_num"][i],
-                line_num=ocr_data["line_num"][i],
-                word_num=ocr_data["word_num"][i]
-            ))
-        
-        # Build full text
-        full_text = pytesseract.image_to_string(
-            image,
-            lang=self.lang,
-            config=config_str
-        )
+        full_text = join_lines(words.text.tolist(), words.block_num, par_num, words.line_num)
         
-        avg_conf = sum(confidences) / len(confidences) if confidences else 0.0
+        avg_conf = float(words.confidence.mean()) if len(words) else 0.0
         
         logger.info(f"OCR Pass [{config_name}]: {len(words)} words, avg confidence {avg_conf:.1f}%")
         
@@ -235,7 +460,8 @@ class MultiPassOCREngine:
         Strategy:
         1. Run general pass for baseline
         2. Run document-specific pass if hint provided
-        3. Run numbers-focused pass
+        3. Run numbers-focused pass, unless the general pass already
+           has NUMBERS_PASS_SKIP_COUNT high-confidence numeric words
         4. Merge results, preferring higher confidence
         
         Args:
@@ -247,34 +473,81 @@ class MultiPassOCREngine:
         """
         logger.info(f"Multi-Pass OCR: Starting with hint='{document_hint}'")
         
-        passes: list[OCRPassResult] = []
+        # Re-uploads of the same image skip OCR entirely
+        cache_key = (_image_digest(image), document_hint)
+        with self._cache_lock:
+            cached = self._result_cache.get(cache_key)
+            if cached is not None:
+                self._result_cache.move_to_end(cache_key)
+                logger.info("Multi-Pass OCR: Cache hit")
+                return cached.copy()
         
         # Pass 1: General text extraction
-        general_result = self._run_single_pass(image, "general")
-        passes.append(general_result)
+        config_names = ["general"]
         
         # Pass 2: Document-specific (if applicable)
         if document_hint in ["receipt", "invoice"]:
-            receipt_result = self._run_single_pass(image, "receipt")
-            passes.append(receipt_result)
+            config_names.append("receipt")
         elif document_hint == "handwritten":
-            sparse_result = self._run_single_pass(image, "sparse")
-            passes.append(sparse_result)
+            config_names.append("sparse")
         
-        # Pass 3: Numbers-focused pass
-        numbers_result = self._run_single_pass(image, "numbers")
-        passes.append(numbers_result)
+        # Passes are independent; run them concurrently on the shared
+        # image (decoded up front so worker threads only read it)
+        image.load()
+        futures = [
+            _PASS_EXECUTOR.submit(self._run_single_pass, image, name)
+            for name in config_names
+        ]
+        
+        # Pass 3: Numbers-focused pass, started with the others so it does
+        # not wait on the general pass; dropped if the general pass already
+        # read enough numbers with high confidence
+        numbers_future = _PASS_EXECUTOR.submit(self._run_single_pass, image, "numbers")
+        general_words = futures[0].result().words
+        confident_numbers = int(np.count_nonzero(
+            _has_digit(general_words.text)
+            & (general_words.confidence >= self.HIGH_CONFIDENCE_THRESHOLD)
+        ))
+        skip_numbers = confident_numbers >= self.NUMBERS_PASS_SKIP_COUNT
+        if skip_numbers:
+            # Not awaited: a pass that already started finishes unused
+            numbers_future.cancel()
+            logger.info(f"Multi-Pass OCR: Skipping numbers pass "
+                       f"({confident_numbers} confident numeric words)")
+        else:
+            futures.append(numbers_future)
+        
+        passes: list[OCRPassResult] = [future.result() for future in futures]
         
         # Merge results
-        merged = self._merge_passes(passes)
+        merged = self._merge_passes(passes, numbers_pass_skipped=skip_numbers)
+        if skip_numbers:
+            merged.config_summary = f"{merged.config_summary.rstrip()} (numbers pass skipped)"
+        
+        # Failed runs are not cached so they can be retried
+        if any(p.word_count for p in passes):
+            with self._cache_lock:
+                self._result_cache[cache_key] = merged.copy()
+                if len(self._result_cache) > self.RESULT_CACHE_SIZE:
+                    self._result_cache.popitem(last=False)
         
         return merged
     
-    def _merge_passes(self, passes: list[OCRPassResult]) -> MultiPassOCRResult:
+    def _merge_passes(
+        self,
+        passes: list[OCRPassResult],
+        numbers_pass_skipped: bool = False
+    ) -> MultiPassOCRResult:
         """
         Merge results from multiple OCR passes.
         
         Uses confidence-weighted merging for ambiguous words.
+        
+        Args:
+            passes: Pass results, general pass first
+            numbers_pass_skipped: The numbers pass was skipped because the
+                general pass already read enough numbers; take numbers from
+                its digit-bearing words instead
         """
         if not passes:
             return MultiPassOCRResult(
@@ -292,35 +565,39 @@ class MultiPassOCREngine:
         best_pass = max(passes, key=lambda p: p.average_confidence)
         primary_text = best_pass.text
         
-        # Collect word confidences from all passes
-        word_confidences: dict[str, float] = {}
-        for pass_result in passes:
-            for word in pass_result.words:
-                key = word.text.lower()
-                if key not in word_confidences or word.confidence > word_confidences[key]:
-                    word_confidences[key] = word.confidence
+        # Collect word confidences from all passes: best confidence per
+        # lowercased word, in order of first appearance
+        all_lower = np.concatenate([p.words.text_lower for p in passes])
+        all_conf = np.concatenate([p.words.confidence for p in passes])
+        keys, first_index, inverse = np.unique(
+            all_lower, return_index=True, return_inverse=True
+        )
+        best_conf = np.full(len(keys), -np.inf)
+        np.maximum.at(best_conf, inverse, all_conf)
+        order = np.argsort(first_index)
+        keys, best_conf = keys[order], best_conf[order]
+        word_confidences: dict[str, float] = dict(zip(keys.tolist(), best_conf.tolist()))
         
         # Find low confidence words
-        low_conf_words = [
-            word for word, conf in word_confidences.items()
-            if conf < self.LOW_CONFIDENCE_THRESHOLD
-        ]
+        low_conf_words = keys[best_conf < self.LOW_CONFIDENCE_THRESHOLD].tolist()
         
         # Extract numbers from numbers-focused pass
         numbers: list[str] = []
         for pass_result in passes:
             if "whitelist" in pass_result.config_used:
-                for word in pass_result.words:
-                    # Check if word contains digits
-                    if any(c.isdigit() for c in word.text):
-                        numbers.append(word.text)
+                texts = pass_result.words.text
+                numbers.extend(texts[_has_digit(texts)].tolist())
+        
+        # Skipped numbers pass: the general pass's numeric words stand in,
+        # keeping dates and amounts whole as the word-level pass would
+        if numbers_pass_skipped:
+            texts = passes[0].words.text
+            numbers.extend(texts[_has_digit(texts)].tolist())
         
         # If no numbers from focused pass, extract from general
         if not numbers:
-            import re
             for pass_result in passes:
-                found = re.findall(r'[\d.,]+', pass_result.text)
-                numbers.extend(found)
+                numbers.extend(_NUMBER_RE.findall(pass_result.text))
         
         # Remove duplicates while preserving order
         seen = set()
@@ -346,6 +623,28 @@ class MultiPassOCREngine:
         )
 
 
+# Shared engines by language, reused across requests
+_ENGINES: dict[str, MultiPassOCREngine] = {}
+_ENGINES_LOCK = threading.Lock()
+
+
+def get_ocr_engine(lang: str = "eng") -> MultiPassOCREngine:
+    """
+    Get the shared OCR engine for a language, creating it on first use.
+    
+    Args:
+        lang: Tesseract language code
+        
+    Returns:
+        MultiPassOCREngine instance
+    """
+    with _ENGINES_LOCK:
+        engine = _ENGINES.get(lang)
+        if engine is None:
+            engine = _ENGINES[lang] = MultiPassOCREngine(lang=lang)
+        return engine
+
+
 def run_ocr(
     image: Image.Image, 
     document_type: str = "unknown",
@@ -362,5 +661,5 @@ def run_ocr(
     Returns:
         MultiPassOCRResult with comprehensive OCR output
     """
-    engine = MultiPassOCREngine(lang=lang)
+    engine = get_ocr_engine(lang)
     return engine.run_multi_pass(image, document_hint=document_type)
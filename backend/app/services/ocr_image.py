@@ -0,0 +1,39 @@
+"""OCR Image Helpers for SMELens
+
+Image sizing rules shared by the preprocessor and the single-pass OCR
+service, so both hand Tesseract images of the same scale.
+"""
+import math
+
+# Minimum image dimensions for reliable OCR
+MIN_OCR_WIDTH = 800
+MIN_OCR_HEIGHT = 600
+
+# Largest pixel count kept for OCR; accuracy plateaus beyond ~300 DPI.
+# Capping area rather than the longest side leaves long, narrow
+# receipts their width.
+MAX_OCR_PIXELS = 2400 * 1800
+
+
+def downscale_factor(
+    width: int,
+    height: int,
+    min_width: int = MIN_OCR_WIDTH,
+    min_height: int = MIN_OCR_HEIGHT
+) -> float:
+    """
+    Scale factor that brings an image within MAX_OCR_PIXELS.
+    
+    Never shrinks a side below its minimum, so the result can leave an
+    image above the cap.
+    
+    Returns:
+        Factor in (0.0, 1.0]; 1.0 means keep the image as is
+    """
+    area = width * height
+    if area <= MAX_OCR_PIXELS:
+        return 1.0
+    
+    scale = math.sqrt(MAX_OCR_PIXELS / area)
+    scale = max(scale, min_width / width, min_height / height)
+    return min(scale, 1.0)
@@ -0,0 +1,37 @@
+"""OCR Text Helpers for SMELens
+
+Rebuilds page text from Tesseract image_to_data output. Shared by the
+single-pass OCR service and the multi-pass OCR engine.
+"""
+import numpy as np
+
+
+def join_lines(
+    texts: list[str],
+    block_num: np.ndarray,
+    par_num: np.ndarray,
+    line_num: np.ndarray
+) -> str:
+    """
+    Rebuild page text from filtered image_to_data words.
+    
+    Words are joined per (block, paragraph, line), with a blank line
+    between paragraphs as image_to_string does.
+    """
+    n = len(texts)
+    if not n:
+        return ""
+    
+    new_par = np.ones(n, dtype=bool)
+    new_par[1:] = (block_num[1:] != block_num[:-1]) | (par_num[1:] != par_num[:-1])
+    new_line = new_par.copy()
+    new_line[1:] |= line_num[1:] != line_num[:-1]
+    
+    starts = np.flatnonzero(new_line).tolist()
+    lines: list[str] = []
+    for start, end in zip(starts, starts[1:] + [n]):
+        if start and new_par[start]:
+            lines.append("")
+        lines.append(" ".join(texts[start:end]))
+    
+    return "\n".join(lines)
@@ -12,15 +12,54 @@ Techniques:
 - Border removal
 """
 import logging
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Callable
 from dataclasses import dataclass
 from enum import Enum
 import numpy as np
 from PIL import Image, ImageFilter, ImageEnhance, ImageOps
 
+from .ocr_image import MIN_OCR_WIDTH, MIN_OCR_HEIGHT, downscale_factor
+
+try:
+    import cv2
+except ImportError:
+    # Without OpenCV the same steps run through PIL filters
+    cv2 = None
+
+try:
+    from scipy import ndimage
+except ImportError:
+    ndimage = None
+
 logger = logging.getLogger(__name__)
 
 
+def _adaptive_mean_threshold(arr: np.ndarray, win: int, offset: int) -> np.ndarray:
+    """
+    Binarize a uint8 image against its local mean over a win x win window.
+    
+    Window sums come from a summed-area table (four lookups per pixel), and
+    the comparison stays in integers: ``pixel > mean - offset`` is tested
+    as ``pixel * area > sum - offset * area``.
+    """
+    r = win // 2
+    padded = np.pad(arr, r, mode="edge")
+    
+    # Summed-area table with a leading zero row/column
+    dtype = np.int32 if padded.size * 255 < 2**31 else np.int64
+    sat = np.zeros((padded.shape[0] + 1, padded.shape[1] + 1), dtype=dtype)
+    np.cumsum(padded, axis=0, dtype=dtype, out=sat[1:, 1:])
+    np.cumsum(sat[1:, 1:], axis=1, out=sat[1:, 1:])
+    
+    window_sum = sat[win:, win:] - sat[:-win, win:] - sat[win:, :-win] + sat[:-win, :-win]
+    area = win * win
+    
+    # Widen before multiplying: NumPy 1.x value-based casting would keep
+    # uint8 * area in uint16 and overflow
+    scaled = arr.astype(dtype) * area
+    return np.where(scaled > window_sum - offset * area, np.uint8(255), np.uint8(0))
+
+
 class DocumentType(Enum):
     """Document types for adaptive preprocessing."""
     RECEIPT = "receipt"
@@ -52,8 +91,8 @@ class ImagePreprocessor:
     TARGET_DPI: int = 300
     
     # Minimum image dimensions for reliable OCR
-    MIN_WIDTH: int = 800
-    MIN_HEIGHT: int = 600
+    MIN_WIDTH: int = MIN_OCR_WIDTH
+    MIN_HEIGHT: int = MIN_OCR_HEIGHT
     
     def __init__(self, document_type: DocumentType = DocumentType.UNKNOWN):
         """
@@ -64,6 +103,29 @@ class ImagePreprocessor:
         """
         self.document_type = document_type
         self.transforms_applied: list[str] = []
+        
+        # The steps depend only on the document type, so the pipeline is
+        # assembled once here instead of re-deciding on every image
+        self._image_steps: list[Callable[[Image.Image], Image.Image]] = [
+            self._ensure_rgb,           # Step 1: Convert to RGB if needed (handle RGBA, P, etc.)
+            self._ensure_minimum_size,  # Step 2: Resize if too small
+            self._to_grayscale,         # Step 3: Convert to grayscale
+            self._cap_pixel_count,      # Step 3b: Downscale oversized photos before any
+                                        # filtering (after grayscale: one channel resampled)
+        ]
+        self._array_steps: list[Callable[[np.ndarray], np.ndarray]] = [
+            self._denoise,              # Step 4: Denoise
+            self._enhance_contrast,     # Step 5: Enhance contrast
+        ]
+        
+        # Step 6: Apply adaptive thresholding for handwritten/low-quality;
+        # otherwise sharpen text edges. Sharpening a 0/255 image is a
+        # no-op (each pixel saturates back to itself), so the two steps
+        # are exclusive and the binary image skips a full filter pass.
+        if document_type in [DocumentType.HANDWRITTEN, DocumentType.UNKNOWN]:
+            self._array_steps.append(self._adaptive_threshold)
+        else:
+            self._array_steps.append(self._sharpen)
     
     def preprocess(self, image: Image.Image) -> PreprocessingResult:
         """
@@ -80,30 +142,18 @@ class ImagePreprocessor:
         
         logger.info(f"Preprocessing: Starting - size {image.size}, mode {image.mode}")
         
-        # Step 1: Convert to RGB if needed (handle RGBA, P, etc.)
-        image = self._ensure_rgb(image)
-        
-        # Step 2: Resize if too small
-        image = self._ensure_minimum_size(image)
-        
-        # Step 3: Convert to grayscale
-        image = self._to_grayscale(image)
-        
-        # Step 4: Denoise
-        image = self._denoise(image)
-        
-        # Step 5: Enhance contrast
-        image = self._enhance_contrast(image)
-        
-        # Step 6: Apply adaptive thresholding for handwritten/low-quality
-        if self.document_type in [DocumentType.HANDWRITTEN, DocumentType.UNKNOWN]:
-            image = self._adaptive_threshold(image)
+        for step in self._image_steps:
+            image = step(image)
         
-        # Step 7: Sharpen text edges
-        image = self._sharpen(image)
+        # Remaining steps work on a single uint8 array
+        arr = np.asarray(image)
+        for step in self._array_steps:
+            arr = step(arr)
         
         # Estimate quality based on image characteristics
-        quality = self._estimate_quality(image)
+        quality = self._estimate_quality(arr)
+        
+        image = Image.fromarray(arr, mode="L")
         
         logger.info(f"Preprocessing: Complete - {len(self.transforms_applied)} transforms, quality={quality:.2f}")
         
@@ -151,93 +201,117 @@ class ImagePreprocessor:
         
         return resized
     
+    def _cap_pixel_count(self, image: Image.Image) -> Image.Image:
+        """Downscale oversized images, never below MIN_WIDTH x MIN_HEIGHT."""
+        width, height = image.size
+        scale = downscale_factor(width, height, self.MIN_WIDTH, self.MIN_HEIGHT)
+        
+        if scale >= 1:
+            return image
+        
+        new_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        resized = image.resize(new_size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+        
+        self.transforms_applied.append(f"downscale_{scale:.2f}x")
+        logger.info(f"Preprocessing: Downscaled from {image.size} to {new_size}")
+        
+        return resized
+    
     def _to_grayscale(self, image: Image.Image) -> Image.Image:
         """Convert to grayscale for OCR processing."""
         gray = image.convert("L")
         self.transforms_applied.append("grayscale")
         return gray
     
-    def _denoise(self, image: Image.Image) -> Image.Image:
+    def _denoise(self, arr: np.ndarray) -> np.ndarray:
         """Remove noise using median filter."""
         # Median filter is effective for salt-and-pepper noise
-        denoised = image.filter(ImageFilter.MedianFilter(size=3))
+        if cv2 is not None:
+            denoised = cv2.medianBlur(arr, 3)
+        else:
+            denoised = np.asarray(Image.fromarray(arr).filter(ImageFilter.MedianFilter(size=3)))
         self.transforms_applied.append("denoise_median")
         return denoised
     
-    def _enhance_contrast(self, image: Image.Image) -> Image.Image:
+    def _enhance_contrast(self, arr: np.ndarray) -> np.ndarray:
         """
         Enhance contrast using histogram equalization.
         
         For low-contrast documents, this significantly improves OCR.
         """
-        # Use PIL's autocontrast for histogram stretching
-        enhanced = ImageOps.autocontrast(image, cutoff=1)
-        
-        # Additional contrast enhancement
-        enhancer = ImageEnhance.Contrast(enhanced)
-        enhanced = enhancer.enhance(1.3)  # Moderate contrast boost
+        if cv2 is not None:
+            # Local histogram equalization (CLAHE)
+            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+            enhanced = clahe.apply(arr)
+        else:
+            # Use PIL's autocontrast for histogram stretching
+            image = ImageOps.autocontrast(Image.fromarray(arr), cutoff=1)
+            
+            # Additional contrast enhancement
+            enhancer = ImageEnhance.Contrast(image)
+            enhanced = np.asarray(enhancer.enhance(1.3))  # Moderate contrast boost
         
         self.transforms_applied.append("contrast_enhance")
         return enhanced
     
-    def _adaptive_threshold(self, image: Image.Image) -> Image.Image:
+    def _adaptive_threshold(self, arr: np.ndarray) -> np.ndarray:
         """
         Apply adaptive thresholding for handwritten text.
         
         This creates a binary image that works better for
         faint or inconsistent handwriting.
         """
-        # Convert to numpy for processing
-        img_array = np.array(image)
-        
-        # Calculate local mean using a sliding window approach
-        # This is a simplified adaptive threshold without OpenCV
-        from PIL import ImageFilter
-        
-        # Use a blur to estimate local background
-        blurred = image.filter(ImageFilter.GaussianBlur(radius=10))
-        blurred_array = np.array(blurred)
-        
         # Threshold: pixel is white if brighter than local mean - offset
         offset = 10  # Sensitivity parameter
-        binary = np.where(img_array > blurred_array - offset, 255, 0).astype(np.uint8)
         
-        result = Image.fromarray(binary, mode="L")
+        if cv2 is not None:
+            binary = cv2.adaptiveThreshold(
+                arr, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, offset
+            )
+        else:
+            binary = _adaptive_mean_threshold(arr, 21, offset)
+        
         self.transforms_applied.append("adaptive_threshold")
         
-        return result
+        return binary
     
-    def _sharpen(self, image: Image.Image) -> Image.Image:
+    def _sharpen(self, arr: np.ndarray) -> np.ndarray:
         """Sharpen text edges for better OCR recognition."""
-        sharpened = image.filter(ImageFilter.SHARPEN)
+        if cv2 is not None:
+            # Same 3x3 kernel as PIL's ImageFilter.SHARPEN
+            kernel = np.full((3, 3), -2 / 16, dtype=np.float32)
+            kernel[1, 1] = 32 / 16
+            sharpened = cv2.filter2D(arr, -1, kernel)
+        else:
+            sharpened = np.asarray(Image.fromarray(arr).filter(ImageFilter.SHARPEN))
         self.transforms_applied.append("sharpen")
         return sharpened
     
-    def _estimate_quality(self, image: Image.Image) -> float:
+    def _estimate_quality(self, arr: np.ndarray) -> float:
         """
         Estimate image quality for OCR based on image characteristics.
         
         Returns a score from 0.0 (poor) to 1.0 (excellent).
         """
-        img_array = np.array(image)
-        
         # Factor 1: Contrast (standard deviation of pixel values)
-        std_dev = np.std(img_array)
+        std_dev = np.std(arr)
         contrast_score = min(std_dev / 80, 1.0)  # Normalize to 0-1
         
         # Factor 2: Sharpness (edge detection via Laplacian variance)
         # Higher variance = sharper image
-        laplacian = np.array([[0, 1, 0], [1, -4, 1], [0, 1, 0]])
-        from scipy import ndimage
-        try:
-            edge_response = ndimage.convolve(img_array.astype(float), laplacian)
+        if cv2 is not None:
+            # Responses fit in int16 (|4 * 255| < 2**15): half the float32 buffer
+            sharpness_score = min(cv2.Laplacian(arr, cv2.CV_16S).var() / 1000, 1.0)
+        elif ndimage is not None:
+            laplacian = np.array([[0, 1, 0], [1, -4, 1], [0, 1, 0]])
+            edge_response = ndimage.convolve(arr.astype(np.int16), laplacian)
             sharpness_score = min(np.var(edge_response) / 1000, 1.0)
-        except ImportError:
+        else:
             # Fallback if scipy not available
             sharpness_score = 0.5
         
         # Factor 3: Size adequacy
-        width, height = image.size
+        height, width = arr.shape
         size_score = min((width * height) / (1500 * 2000), 1.0)
         
         # Weighted average
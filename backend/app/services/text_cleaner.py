@@ -10,21 +10,183 @@ Features:
 - Whitespace cleanup
 - Common word corrections
 """
+import os
 import re
+import atexit
 import logging
-from typing import Optional
-from dataclasses import dataclass
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property, lru_cache
+from typing import Callable, Optional
+from dataclasses import dataclass, field, replace
 
 logger = logging.getLogger(__name__)
 
+# Cleaned results kept for repeated text (retries, re-analysis)
+CLEAN_CACHE_SIZE = 256
+
+# Batches smaller than this are cleaned in-process; pickling texts to the
+# workers costs more than the regex work it would spread out
+BATCH_PARALLEL_MIN = 32
+
+# Whitespace and decimal rules, compiled once
+_MULTI_SPACE_RE = re.compile(r' {2,}')
+_MULTI_NEWLINE_RE = re.compile(r'\n{3,}')
+_TRAILING_WS_RE = re.compile(r'[^\S\n]+$', re.MULTILINE)
+# Every ASCII whitespace character str.rstrip removes, followed by a newline
+_ASCII_TRAILING_WS = tuple(c + '\n' for c in ' \t\r\x0b\x0c\x1c\x1d\x1e\x1f')
+_DECIMAL_SPACE_RE = re.compile(r'(\d+)\.\s+(\d{2})\b')
+_DECIMAL_COMMA_RE = re.compile(r'(\d+),(\d{2})\b(?!\d)')
+
+# Month abbreviations factored by shared prefix (Jan/Jun/Jul, Mar/May, ...)
+_MONTH = r'(?:J(?:an|u[nl])|Feb|Ma[ry]|A(?:pr|ug)|Sep|Oct|Nov|Dec)'
+
+# Amount extraction used by TextCorrector
+_AMOUNT_RE = re.compile(r'\$?\s*([\d,]+\.?\d*)')
+_DECIMAL_AMOUNT_RE = re.compile(r'\$?\s*([\d,]+\.\d+)')
+
+# Cent values treated as normal pricing (.00, .25, .50, .75, .95, .99)
+_COMMON_DECIMALS = frozenset({0, 25, 50, 75, 95, 99})
+
+# Every confusion rule match contains one of these characters and every
+# currency rule match contains a "$" or a K, so text without them can skip
+# the regex pass entirely. The non-ASCII entries are the letters that
+# re.IGNORECASE also folds onto S, I and K.
+_CONFUSION_CHARS = "OoLlSsIiBbTt\u017f\u0130\u0131"
+_CURRENCY_MARKERS = ("$", "K", "k", "\u212a")
+
+# Shapes of CHAR_CONFUSIONS sources: "(?<=X)c..." letter rules and
+# "\bWORD\b" word rules
+_LETTER_RULE_RE = re.compile(r'\(\?<=(.+?)\)(\w)(.*)')
+_WORD_RULE_RE = re.compile(r'\\b(\w+)\\b')
+
+
+def _fuse_confusions(rules: list[tuple]) -> re.Pattern:
+    """
+    Fuse the character confusion rules into one alternation.
+
+    Rule N becomes named group ``cN``; letter rules keep priority over the
+    word rules that follow them in the list. Each letter rule is rewritten
+    to match its letter first and check the lookbehind after it, and the
+    whole pattern is gated on a class of possible first characters, so
+    the scan only tries the branches at positions that can start a match.
+
+    The rules used to run one after another, so a letter right after a
+    "$O"/"$l" saw a digit by the time the later per-letter rules ran;
+    those lookbehinds are widened to keep that result in a single scan.
+    """
+    letters = []
+    words = []
+    first_chars = set()
+    dollar_letters = ''
+    for index, (pattern, _, _) in enumerate(rules):
+        source = pattern.pattern
+        word = _WORD_RULE_RE.fullmatch(source)
+        if word:
+            words.append(f"(?P<c{index}>{word[1]})")
+            first_chars.add(word[1][0])
+            continue
+        behind, letter, rest = _LETTER_RULE_RE.fullmatch(source).groups()
+        lookbehind = f"(?<={behind}{letter})"
+        if behind == '\\$':
+            dollar_letters += letter
+        elif dollar_letters:
+            lookbehind = f"(?:{lookbehind}|(?<=\\$[{dollar_letters}]{letter}))"
+        letters.append(f"(?P<c{index}>{letter}{lookbehind}{rest})")
+        first_chars.add(letter)
+    return re.compile(
+        f"(?=[{''.join(sorted(first_chars))}])"
+        f"(?:{'|'.join(letters)}|\\b(?:{'|'.join(words)})\\b)",
+        re.IGNORECASE,
+    )
+
+
+def _ascii_pattern(pattern: re.Pattern) -> re.Pattern:
+    """Bytes twin of a str pattern that matches the same on ASCII text."""
+    # In str patterns \s also matches \x1c-\x1f; bytes patterns do not
+    source = pattern.pattern.replace(r'\s', r'[\s\x1c-\x1f]')
+    return re.compile(source.encode('ascii'), pattern.flags & ~re.UNICODE)
+
+
+@dataclass(frozen=True)
+class _RuleSet:
+    """Compiled cleaning rules for one text type (str, or ASCII bytes)."""
+    confusion_re: re.Pattern
+    # group name -> (CHAR_CONFUSIONS index, replacement)
+    confusion_repl: dict
+    confusion_chars: str | bytes
+    # (pattern, replacement, description, needle) per CURRENCY_PATTERNS rule
+    currency: tuple
+    currency_markers: tuple
+    fold: Callable
+    decimal_space_re: re.Pattern
+    decimal_comma_re: re.Pattern
+    decimal_repl: str | bytes
+
+
+def _build_rule_set(
+    confusions: list[tuple],
+    currency: list[tuple],
+    needles: tuple,
+    ascii_only: bool
+) -> _RuleSet:
+    """Compile the cleaner rules for str text, or for ASCII text as bytes."""
+    if ascii_only:
+        convert, encode = _ascii_pattern, lambda s: s.encode('ascii')
+    else:
+        convert, encode = (lambda p: p), (lambda s: s)
+    
+    return _RuleSet(
+        confusion_re=convert(_fuse_confusions(confusions)),
+        confusion_repl={
+            f"c{index}": (index, encode(replacement))
+            for index, (_, replacement, _) in enumerate(confusions)
+        },
+        confusion_chars=encode(
+            ''.join(c for c in _CONFUSION_CHARS if c.isascii() or not ascii_only)
+        ),
+        currency=tuple(
+            (convert(pattern), encode(replacement), description, encode(needle))
+            for (pattern, replacement, description), needle in zip(currency, needles)
+        ),
+        currency_markers=tuple(
+            encode(marker) for marker in _CURRENCY_MARKERS
+            if marker.isascii() or not ascii_only
+        ),
+        # casefold matches re.IGNORECASE folding; on ASCII it is just lower
+        fold=bytes.lower if ascii_only else str.casefold,
+        decimal_space_re=convert(_DECIMAL_SPACE_RE),
+        decimal_comma_re=convert(_DECIMAL_COMMA_RE),
+        decimal_repl=encode(r'\1.\2'),
+    )
+
 
 @dataclass
 class CleaningResult:
     """Result of text cleaning operation."""
     original_text: str
     cleaned_text: str
-    corrections_made: list[dict]
     correction_count: int
+    # Corrections log as parallel lists; corrections_made builds the dicts
+    correction_types: list[str] = field(default_factory=list)
+    correction_descriptions: list[str] = field(default_factory=list)
+    correction_patterns: list[Optional[str]] = field(default_factory=list)
+    
+    @cached_property
+    def corrections_made(self) -> list[dict]:
+        """Corrections as {"type", "description"[, "pattern"]} dicts."""
+        corrections = []
+        for kind, description, pattern in zip(
+            self.correction_types,
+            self.correction_descriptions,
+            self.correction_patterns,
+        ):
+            entry = {"type": kind, "description": description}
+            if pattern is not None:
+                entry["pattern"] = pattern
+            corrections.append(entry)
+        return corrections
 
 
 class OCRTextCleaner:
@@ -35,64 +197,79 @@ class OCRTextCleaner:
     """
     
     # Common OCR character confusions
-    # Format: (pattern, replacement, context_hint)
+    # Format: (compiled pattern, replacement, context_hint)
     CHAR_CONFUSIONS = [
         # O/0 confusion - replace O with 0 in numeric contexts
-        (r'(?<=[0-9])O(?=[0-9])', '0', 'O→0 in numbers'),
-        (r'(?<=[0-9])O(?=\s|$|,|\.)', '0', 'O→0 at number end'),
-        (r'(?<=\$)O', '0', 'O→0 after $'),
+        (re.compile(r'(?<=[0-9])O(?=[0-9])', re.IGNORECASE), '0', 'O→0 in numbers'),
+        (re.compile(r'(?<=[0-9])O(?=\s|$|,|\.)', re.IGNORECASE), '0', 'O→0 at number end'),
+        (re.compile(r'(?<=\$)O', re.IGNORECASE), '0', 'O→0 after $'),
         
         # l/1 confusion - replace l with 1 in numeric contexts
-        (r'(?<=[0-9])l(?=[0-9])', '1', 'l→1 in numbers'),
-        (r'(?<=\$)l', '1', 'l→1 after $'),
+        (re.compile(r'(?<=[0-9])l(?=[0-9])', re.IGNORECASE), '1', 'l→1 in numbers'),
+        (re.compile(r'(?<=\$)l', re.IGNORECASE), '1', 'l→1 after $'),
         
         # S/5 confusion - replace S with 5 in numeric contexts
-        (r'(?<=[0-9])S(?=[0-9])', '5', 'S→5 in numbers'),
+        (re.compile(r'(?<=[0-9])S(?=[0-9])', re.IGNORECASE), '5', 'S→5 in numbers'),
         
         # I/1 confusion
-        (r'(?<=[0-9])I(?=[0-9])', '1', 'I→1 in numbers'),
+        (re.compile(r'(?<=[0-9])I(?=[0-9])', re.IGNORECASE), '1', 'I→1 in numbers'),
         
         # B/8 confusion
-        (r'(?<=[0-9])B(?=[0-9])', '8', 'B→8 in numbers'),
+        (re.compile(r'(?<=[0-9])B(?=[0-9])', re.IGNORECASE), '8', 'B→8 in numbers'),
         
         # Common word OCR errors
-        (r'\bTOTAI\b', 'TOTAL', 'TOTAI→TOTAL'),
-        (r'\bT0TAL\b', 'TOTAL', 'T0TAL→TOTAL'),
-        (r'\bTOTAL\b', 'TOTAL', 'case normalize'),  # Ensure consistent case
-        (r'\bSUBTOTAI\b', 'SUBTOTAL', 'SUBTOTAI→SUBTOTAL'),
-        (r'\bAM0UNT\b', 'AMOUNT', 'AM0UNT→AMOUNT'),
-        (r'\bBAIANCE\b', 'BALANCE', 'BAIANCE→BALANCE'),
-        (r'\bRECE1PT\b', 'RECEIPT', 'RECE1PT→RECEIPT'),
-        (r'\bINV0ICE\b', 'INVOICE', 'INV0ICE→INVOICE'),
+        (re.compile(r'\bTOTAI\b', re.IGNORECASE), 'TOTAL', 'TOTAI→TOTAL'),
+        (re.compile(r'\bT0TAL\b', re.IGNORECASE), 'TOTAL', 'T0TAL→TOTAL'),
+        (re.compile(r'\bTOTAL\b', re.IGNORECASE), 'TOTAL', 'case normalize'),  # Ensure consistent case
+        (re.compile(r'\bSUBTOTAI\b', re.IGNORECASE), 'SUBTOTAL', 'SUBTOTAI→SUBTOTAL'),
+        (re.compile(r'\bAM0UNT\b', re.IGNORECASE), 'AMOUNT', 'AM0UNT→AMOUNT'),
+        (re.compile(r'\bBAIANCE\b', re.IGNORECASE), 'BALANCE', 'BAIANCE→BALANCE'),
+        (re.compile(r'\bRECE1PT\b', re.IGNORECASE), 'RECEIPT', 'RECE1PT→RECEIPT'),
+        (re.compile(r'\bINV0ICE\b', re.IGNORECASE), 'INVOICE', 'INV0ICE→INVOICE'),
     ]
     
     # Currency patterns to normalize
     CURRENCY_PATTERNS = [
         # Kenya Shillings variations
-        (r'\bKSH\.?\s*', 'KES ', 'KSH→KES'),
-        (r'\bKSHS\.?\s*', 'KES ', 'KSHS→KES'),
-        (r'\bKes\.?\s*', 'KES ', 'Kes→KES'),
+        (re.compile(r'\bKSH\.?\s*', re.IGNORECASE), 'KES ', 'KSH→KES'),
+        (re.compile(r'\bKSHS\.?\s*', re.IGNORECASE), 'KES ', 'KSHS→KES'),
+        (re.compile(r'\bKes\.?\s*', re.IGNORECASE), 'KES ', 'Kes→KES'),
         
         # USD variations
-        (r'\bUS\$\s*', 'USD ', 'US$→USD'),
-        (r'\bUSD\s*\$', 'USD ', 'USD$→USD'),
+        (re.compile(r'\bUS\$\s*', re.IGNORECASE), 'USD ', 'US$→USD'),
+        (re.compile(r'\bUSD\s*\$', re.IGNORECASE), 'USD ', 'USD$→USD'),
         
         # Fix spacing around currency symbols
-        (r'\$\s+(\d)', r'$\1', 'remove space after $'),
-        (r'(\d)\s+\$', r'\1 $', 'normalize space before $'),
+        (re.compile(r'\$\s+(\d)', re.IGNORECASE), r'$\1', 'remove space after $'),
+        (re.compile(r'(\d)\s+\$', re.IGNORECASE), r'\1 $', 'normalize space before $'),
     ]
     
+    # Literal every match of the matching CURRENCY_PATTERNS rule contains,
+    # checked against casefolded text before running the regex
+    _CURRENCY_NEEDLES = ('ksh', 'kshs', 'kes', 'us$', 'usd', '$', '$')
+    
+    # Compiled rules for steps 2-4; ASCII text runs them as bytes, where
+    # the regex engine skips Unicode case folding
+    _STR_RULES = _build_rule_set(
+        CHAR_CONFUSIONS, CURRENCY_PATTERNS, _CURRENCY_NEEDLES, ascii_only=False
+    )
+    _ASCII_RULES = _build_rule_set(
+        CHAR_CONFUSIONS, CURRENCY_PATTERNS, _CURRENCY_NEEDLES, ascii_only=True
+    )
+    
     # Date format patterns - for recognition, not correction
-    DATE_PATTERNS = [
-        r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}',      # MM/DD/YYYY, DD-MM-YY
-        r'\d{4}[/-]\d{1,2}[/-]\d{1,2}',         # YYYY-MM-DD
-        r'\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{2,4}',
-        r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2},?\s+\d{2,4}',
-    ]
+    DATE_PATTERNS = (
+        re.compile(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}'),      # MM/DD/YYYY, DD-MM-YY
+        re.compile(r'\d{4}[/-]\d{1,2}[/-]\d{1,2}'),         # YYYY-MM-DD
+        re.compile(r'\d{1,2}\s+' + _MONTH + r'[a-z]*\s+\d{2,4}'),
+        re.compile(_MONTH + r'[a-z]*\s+\d{1,2},?\s+\d{2,4}'),
+    )
     
     def __init__(self):
         """Initialize the text cleaner."""
-        self.corrections: list[dict] = []
+        self._types: list[str] = []
+        self._descriptions: list[str] = []
+        self._patterns: list[Optional[str]] = []
     
     def clean(self, text: str) -> CleaningResult:
         """
@@ -104,7 +281,7 @@ class OCRTextCleaner:
         Returns:
             CleaningResult with cleaned text and corrections log
         """
-        self.corrections = []
+        self._types, self._descriptions, self._patterns = [], [], []
         original = text
         cleaned = text
         
@@ -113,78 +290,141 @@ class OCRTextCleaner:
         # Step 1: Basic whitespace cleanup
         cleaned = self._clean_whitespace(cleaned)
         
+        # Steps 2-4 work on bytes when the text is ASCII (nearly all receipts)
+        is_ascii = cleaned.isascii()
+        if is_ascii:
+            rules = self._ASCII_RULES
+            cleaned = cleaned.encode('ascii')
+        else:
+            rules = self._STR_RULES
+        
         # Step 2: Fix character confusions
-        cleaned = self._fix_char_confusions(cleaned)
+        cleaned = self._fix_char_confusions(cleaned, rules)
         
         # Step 3: Normalize currency
-        cleaned = self._normalize_currency(cleaned)
+        cleaned = self._normalize_currency(cleaned, rules)
         
         # Step 4: Fix decimal separators in numbers
-        cleaned = self._fix_decimals(cleaned)
+        cleaned = self._fix_decimals(cleaned, rules)
+        
+        if is_ascii:
+            cleaned = cleaned.decode('ascii')
         
         # Step 5: Final whitespace normalization
         cleaned = self._final_normalize(cleaned)
         
-        logger.info(f"TextCleaner: Complete - {len(self.corrections)} corrections")
+        logger.info(f"TextCleaner: Complete - {len(self._types)} corrections")
         
-        return CleaningResult(
+        # Hand the log to the result; the next clean() starts a new one
+        result = CleaningResult(
             original_text=original,
             cleaned_text=cleaned,
-            corrections_made=self.corrections.copy(),
-            correction_count=len(self.corrections)
+            correction_count=len(self._types),
+            correction_types=self._types,
+            correction_descriptions=self._descriptions,
+            correction_patterns=self._patterns
         )
+        self._types, self._descriptions, self._patterns = [], [], []
+        
+        return result
+    
+    def clean_batch(self, texts: list[str]) -> list[CleaningResult]:
+        """
+        Clean many OCR texts, spreading large batches across processes.
+        
+        The rules are pure-Python regex work that holds the GIL, so a
+        process pool is what scales with cores here.
+        
+        Args:
+            texts: Raw OCR texts
+            
+        Returns:
+            CleaningResult per text, in input order
+        """
+        if len(texts) < BATCH_PARALLEL_MIN or _BATCH_WORKERS == 1:
+            return [self.clean(text) for text in texts]
+        
+        pool = _batch_pool()
+        chunksize = max(1, len(texts) // (_BATCH_WORKERS * 4))
+        return list(pool.map(_clean_in_worker, texts, chunksize=chunksize))
+    
+    def _log(self, kind: str, description: str, pattern: Optional[str] = None):
+        """Record one correction in the log."""
+        self._types.append(kind)
+        self._descriptions.append(description)
+        self._patterns.append(pattern)
     
     def _clean_whitespace(self, text: str) -> str:
         """Remove excessive whitespace while preserving structure."""
+        cleaned = text
+        
         # Replace multiple spaces with single space
-        cleaned = re.sub(r' {2,}', ' ', text)
+        if '  ' in cleaned:
+            cleaned = _MULTI_SPACE_RE.sub(' ', cleaned)
         
         # Replace multiple newlines with double newline
-        cleaned = re.sub(r'\n{3,}', '\n\n', cleaned)
-        
-        # Remove trailing whitespace from lines
-        cleaned = '\n'.join(line.rstrip() for line in cleaned.split('\n'))
+        if '\n\n\n' in cleaned:
+            cleaned = _MULTI_NEWLINE_RE.sub('\n\n', cleaned)
+        
+        # Remove trailing whitespace from lines; substring checks rule out
+        # the common clean ASCII case more cheaply than the regex scan
+        if (
+            not cleaned.isascii()
+            or cleaned[-1:].isspace()
+            or any(ws in cleaned for ws in _ASCII_TRAILING_WS)
+        ):
+            cleaned = _TRAILING_WS_RE.sub('', cleaned)
         
         if cleaned != text:
-            self.corrections.append({
-                "type": "whitespace",
-                "description": "Normalized whitespace"
-            })
+            self._log("whitespace", "Normalized whitespace")
         
         return cleaned
     
-    def _fix_char_confusions(self, text: str) -> str:
+    def _fix_char_confusions(self, text: str | bytes, rules: _RuleSet) -> str | bytes:
         """Apply character confusion fixes."""
-        cleaned = text
+        if not any(c in text for c in rules.confusion_chars):
+            return text
         
-        for pattern, replacement, description in self.CHAR_CONFUSIONS:
-            new_text = re.sub(pattern, replacement, cleaned, flags=re.IGNORECASE)
-            if new_text != cleaned:
-                self.corrections.append({
-                    "type": "char_confusion",
-                    "description": description,
-                    "pattern": pattern
-                })
-                cleaned = new_text
+        fired = set()
+        
+        def _dispatch(match: re.Match) -> str | bytes:
+            index, replacement = rules.confusion_repl[match.lastgroup]
+            if match.group() != replacement:
+                fired.add(index)
+            return replacement
+        
+        cleaned = rules.confusion_re.sub(_dispatch, text)
+        
+        # Log in rule order, once per rule that changed something
+        for index in sorted(fired):
+            pattern, _, description = self.CHAR_CONFUSIONS[index]
+            self._log("char_confusion", description, pattern.pattern)
         
         return cleaned
     
-    def _normalize_currency(self, text: str) -> str:
+    def _normalize_currency(self, text: str | bytes, rules: _RuleSet) -> str | bytes:
         """Normalize currency symbols and codes."""
-        cleaned = text
+        if not any(marker in text for marker in rules.currency_markers):
+            return text
         
-        for pattern, replacement, description in self.CURRENCY_PATTERNS:
-            new_text = re.sub(pattern, replacement, cleaned, flags=re.IGNORECASE)
-            if new_text != cleaned:
-                self.corrections.append({
-                    "type": "currency",
-                    "description": description
-                })
+        cleaned = text
+        folded = rules.fold(text)
+        
+        for pattern, replacement, description, needle in rules.currency:
+            if needle not in folded:
+                continue
+            new_text, count = pattern.subn(replacement, cleaned)
+            # Some rules can rewrite already-normal text to itself ("KES "),
+            # so only compare when something actually matched
+            if count and new_text != cleaned:
+                self._log("currency", description)
                 cleaned = new_text
+                # Later rules can match text an earlier one produced
+                folded = rules.fold(cleaned)
         
         return cleaned
     
-    def _fix_decimals(self, text: str) -> str:
+    def _fix_decimals(self, text: str | bytes, rules: _RuleSet) -> str | bytes:
         """
         Fix common decimal separator issues.
         
@@ -193,24 +433,16 @@ class OCRTextCleaner:
         cleaned = text
         
         # Fix space in decimals: "10. 00" -> "10.00"
-        pattern = r'(\d+)\.\s+(\d{2})\b'
-        new_text = re.sub(pattern, r'\1.\2', cleaned)
-        if new_text != cleaned:
-            self.corrections.append({
-                "type": "decimal",
-                "description": "Fixed space in decimal"
-            })
+        new_text, count = rules.decimal_space_re.subn(rules.decimal_repl, cleaned)
+        if count:
+            self._log("decimal", "Fixed space in decimal")
             cleaned = new_text
         
         # Fix comma as decimal: "10,00" -> "10.00" (common in some locales)
         # Only when followed by exactly 2 digits (likely decimal, not thousands)
-        pattern = r'(\d+),(\d{2})\b(?!\d)'
-        new_text = re.sub(pattern, r'\1.\2', cleaned)
-        if new_text != cleaned:
-            self.corrections.append({
-                "type": "decimal",
-                "description": "Converted comma decimal to period"
-            })
+        new_text, count = rules.decimal_comma_re.subn(rules.decimal_repl, cleaned)
+        if count:
+            self._log("decimal", "Converted comma decimal to period")
             cleaned = new_text
         
         return cleaned
@@ -246,6 +478,9 @@ class TextCorrector:
         'receipt date', 'transaction'
     ]
     
+    # Matches a line containing any AMOUNT_KEYWORDS entry
+    _AMOUNT_KEYWORD_RE = re.compile('|'.join(map(re.escape, AMOUNT_KEYWORDS)))
+    
     def find_amounts_near_keywords(self, text: str) -> list[dict]:
         """
         Find amounts that appear near total-related keywords.
@@ -256,26 +491,35 @@ class TextCorrector:
         lines = text.lower().split('\n')
         
         for i, line in enumerate(lines):
+            # One scan rules out lines with no keyword at all
+            if not self._AMOUNT_KEYWORD_RE.search(line):
+                continue
+            
+            # Look for amounts on this line or next line
+            search_text = line
+            if i + 1 < len(lines):
+                search_text += ' ' + lines[i + 1]
+            
+            # Find all dollar amounts, parsed once for every keyword hit
+            values = []
+            for match in _AMOUNT_RE.finditer(search_text):
+                amount = match.group(1)
+                if ',' in amount:
+                    amount = amount.replace(',', '')
+                try:
+                    values.append(float(amount))
+                except ValueError:
+                    continue
+            
             for keyword in self.AMOUNT_KEYWORDS:
                 if keyword in line:
-                    # Look for amounts on this line or next line
-                    search_text = line
-                    if i + 1 < len(lines):
-                        search_text += ' ' + lines[i + 1]
-                    
-                    # Find all dollar amounts
-                    amounts = re.findall(r'\$?\s*([\d,]+\.?\d*)', search_text)
-                    for amount in amounts:
-                        try:
-                            value = float(amount.replace(',', ''))
-                            results.append({
-                                "value": value,
-                                "keyword": keyword,
-                                "line": i,
-                                "proximity_score": 0.9 if keyword in line else 0.7
-                            })
-                        except ValueError:
-                            continue
+                    for value in values:
+                        results.append({
+                            "value": value,
+                            "keyword": keyword,
+                            "line": i,
+                            "proximity_score": 0.9
+                        })
         
         return results
     
@@ -291,16 +535,23 @@ class TextCorrector:
         suspicious = []
         
         # Find all potential amounts
-        amounts = re.findall(r'\$?\s*([\d,]+\.\d+)', text)
+        amounts = _DECIMAL_AMOUNT_RE.findall(text)
         
         for amount in amounts:
             try:
-                value = float(amount.replace(',', ''))
+                # Exact integer arithmetic: the amount is units / scale
+                digits = amount.replace(',', '') if ',' in amount else amount
+                whole, _, fraction = digits.partition('.')
+                units = int(whole + fraction)
+                scale = 10 ** len(fraction)
                 
-                # Check for unusual decimal values
-                decimal_part = value - int(value)
-                common_decimals = [0.0, 0.25, 0.50, 0.75, 0.99, 0.95]
-                if decimal_part not in common_decimals and value > 10:
+                # Check for unusual decimal values: anything finer than
+                # a cent is unusual, otherwise compare the whole cents
+                if len(fraction.rstrip('0')) > 2:
+                    unusual = True
+                else:
+                    unusual = (units * 100 // scale) % 100 not in _COMMON_DECIMALS
+                if unusual and units > 10 * scale:
                     suspicious.append({
                         "value": amount,
                         "reason": "Unusual decimal value",
@@ -308,7 +559,7 @@ class TextCorrector:
                     })
                 
                 # Check for suspiciously large values
-                if value > 1000000:
+                if units > 1000000 * scale:
                     suspicious.append({
                         "value": amount,
                         "reason": "Very large value - verify accuracy",
@@ -335,5 +586,58 @@ def clean_text(text: str) -> CleaningResult:
     Returns:
         CleaningResult with cleaned text and corrections
     """
-    cleaner = OCRTextCleaner()
-    return cleaner.clean(text)
+    # The cached result is shared; the copy gets its own correction lists
+    # and builds its own corrections_made dicts, so callers can modify them
+    cached = _clean_text_cached(text)
+    return replace(
+        cached,
+        correction_types=list(cached.correction_types),
+        correction_descriptions=list(cached.correction_descriptions),
+        correction_patterns=list(cached.correction_patterns)
+    )
+
+
+@lru_cache(maxsize=CLEAN_CACHE_SIZE)
+def _clean_text_cached(text: str) -> CleaningResult:
+    """Clean text once per distinct input; see clean_text."""
+    return OCRTextCleaner().clean(text)
+
+
+
+# Shared clean_batch workers, started on first use and kept for the process
+# lifetime. Spawned rather than forked: the server process runs threads
+# whose locks a forked child could inherit mid-acquire.
+_BATCH_WORKERS = os.cpu_count() or 1
+_batch_executor: Optional[ProcessPoolExecutor] = None
+_batch_executor_lock = threading.Lock()
+_worker_cleaner: Optional[OCRTextCleaner] = None
+
+
+def _batch_pool() -> ProcessPoolExecutor:
+    """Get the shared clean_batch process pool, creating it on first use."""
+    global _batch_executor
+    with _batch_executor_lock:
+        if _batch_executor is None:
+            _batch_executor = ProcessPoolExecutor(
+                max_workers=_BATCH_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_batch_worker
+            )
+        return _batch_executor
+
+
+@atexit.register
+def _shutdown_batch_pool():
+    if _batch_executor is not None:
+        _batch_executor.shutdown(cancel_futures=True)
+
+
+def _init_batch_worker():
+    """Give each clean_batch worker process its own cleaner."""
+    global _worker_cleaner
+    _worker_cleaner = OCRTextCleaner()
+
+
+def _clean_in_worker(text: str) -> CleaningResult:
+    """Clean one text inside a clean_batch worker."""
+    return _worker_cleaner.clean(text)
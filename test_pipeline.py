@@ -3,7 +3,22 @@ from PIL import Image, ImageDraw, ImageFont
 import io
 import json
 
+# Load the font once; parsing the font file dominates repeated renders
+try:
+    _FONT = ImageFont.truetype("DejaVuSans.ttf", 20)
+except OSError:
+    _FONT = ImageFont.load_default()
+
+# PNG bytes of the test receipt, rendered on first use
+_TEST_IMG_BYTES = None
+
 def create_test_image():
+    global _TEST_IMG_BYTES
+    if _TEST_IMG_BYTES is None:
+        _TEST_IMG_BYTES = _render_test_image()
+    return io.BytesIO(_TEST_IMG_BYTES)
+
+def _render_test_image():
     # Create a white image
     img = Image.new('RGB', (800, 1000), color='white')
     d = ImageDraw.Draw(img)
@@ -25,19 +40,12 @@ def create_test_image():
     Thank you for shopping!
     """
     
-    # Use default font
-    try:
-        font = ImageFont.truetype("DejaVuSans.ttf", 20)
-    except:
-        font = ImageFont.load_default()
-        
-    d.text((50, 50), text, fill='black', font=font)
+    d.text((50, 50), text, fill='black', font=_FONT)
     
     # Save to bytes
     img_byte_arr = io.BytesIO()
     img.save(img_byte_arr, format='PNG')
-    img_byte_arr.seek(0)
-    return img_byte_arr
+    return img_byte_arr.getvalue()
 
 def test_upload():
     url = "http://localhost:8000/upload"